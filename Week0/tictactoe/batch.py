@@ -0,0 +1,122 @@
+"""
+Vectorized Tic Tac Toe helpers for scoring many boards at once.
+
+Boards are stacked into an (N, 3, 3) int8 array with X = 1, O = -1 and
+EMPTY = 0, so every line of three can be scored with a single sum.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+import tictactoe as ttt
+
+X = 1
+O = -1
+EMPTY = 0
+
+_CODES = {ttt.X: X, ttt.O: O, ttt.EMPTY: EMPTY}
+_MARKS = {X: ttt.X, O: ttt.O, EMPTY: ttt.EMPTY}
+
+Evaluation = namedtuple("Evaluation", ["player", "terminal", "winner", "utility"])
+
+
+def from_boards(boards):
+    """
+    Returns an (N, 3, 3) array encoding a sequence of list-of-lists boards.
+    """
+    return np.array(
+        [[[_CODES[cell] for cell in row] for row in board] for board in boards],
+        dtype=np.int8,
+    ).reshape(-1, 3, 3)
+
+
+def to_board(array):
+    """
+    Returns the list-of-lists board for a single (3, 3) array.
+    """
+    return [[_MARKS[int(cell)] for cell in row] for row in array]
+
+
+def line_sums(boards):
+    """
+    Returns an (N, 8) array with the sum of every row, column and diagonal.
+    """
+    boards = np.asarray(boards, dtype=np.int8).astype(np.int16)
+    return np.concatenate([
+        boards.sum(axis=2),
+        boards.sum(axis=1),
+        np.trace(boards, axis1=1, axis2=2)[:, None],
+        np.trace(boards[:, :, ::-1], axis1=1, axis2=2)[:, None],
+    ], axis=1)
+
+
+def _winner_from_sums(sums):
+    return np.where((sums == 3).any(axis=1), X,
+                    np.where((sums == -3).any(axis=1), O, EMPTY)).astype(np.int8)
+
+
+def player(boards):
+    """
+    Returns an (N,) array with the player to move on each board,
+    X (1) when the number of empty cells is odd and O (-1) otherwise.
+    """
+    open_spaces = (np.asarray(boards) == EMPTY).sum(axis=(1, 2))
+    return np.where(open_spaces % 2 == 1, X, O).astype(np.int8)
+
+
+def winner(boards):
+    """
+    Returns an (N,) array with the winner of each board: X (1), O (-1),
+    or 0 if nobody has three in a row.
+    """
+    return _winner_from_sums(line_sums(boards))
+
+
+def terminal(boards):
+    """
+    Returns an (N,) bool array, True where a board has a winner or is full.
+    """
+    boards = np.asarray(boards)
+    return (winner(boards) != EMPTY) | ~(boards == EMPTY).any(axis=(1, 2))
+
+
+def utility(boards):
+    """
+    Returns an (N,) array with 1 where X has won, -1 where O has won, 0 otherwise.
+    """
+    return winner(boards)
+
+
+def evaluate(boards):
+    """
+    Returns the player, terminal flag, winner and utility of every board,
+    sharing one pass over the line sums.
+    """
+    boards = np.asarray(boards, dtype=np.int8)
+    sums = line_sums(boards)
+    wins = _winner_from_sums(sums)
+    open_spaces = (boards == EMPTY).sum(axis=(1, 2))
+    return Evaluation(
+        player=np.where(open_spaces % 2 == 1, X, O).astype(np.int8),
+        terminal=(wins != EMPTY) | (open_spaces == 0),
+        winner=wins,
+        utility=wins,
+    )
+
+
+def children(boards):
+    """
+    Expands every legal move of every non-terminal board at once.
+
+    Returns (children, parents, actions): an (M, 3, 3) array of resulting
+    boards, an (M,) array with the index of the board each child came from,
+    and an (M, 2) array with the (row, col) move that produced it.
+    """
+    boards = np.asarray(boards, dtype=np.int8)
+    info = evaluate(boards)
+    playable = (boards == EMPTY) & ~info.terminal[:, None, None]
+    parents, rows, cols = np.nonzero(playable)
+    expanded = boards[parents].copy()
+    expanded[np.arange(len(parents)), rows, cols] = info.player[parents]
+    return expanded, parents, np.stack([rows, cols], axis=1)
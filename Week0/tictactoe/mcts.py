@@ -0,0 +1,146 @@
+"""
+Monte Carlo Tree Search player for Tic Tac Toe and similar games.
+
+Works with any module offering the same interface as tictactoe.py:
+X, player, actions, result, terminal and utility (1 when X wins, -1 when
+the other player wins, 0 otherwise). Searches are anytime: they run for a
+number of iterations or a time budget, and more of either only improves
+the statistics the move is chosen from.
+"""
+
+import concurrent.futures
+import importlib
+import math
+import random
+import time
+
+import tictactoe as ttt
+
+EXPLORATION = math.sqrt(2)
+DEFAULT_ITERATIONS = 2000
+
+
+class Node():
+    """
+    A board in the search tree, with the statistics of every playout
+    that passed through it. wins are counted for the player who made the
+    move leading here, so a parent picks the child with the best record.
+    """
+
+    def __init__(self, game, board, parent=None, action=None):
+        self.board = board
+        self.parent = parent
+        self.action = action
+        self.children = []
+        self.untried = [] if game.terminal(board) else sorted(game.actions(board))
+        self.visits = 0
+        self.wins = 0.0
+
+    def uct_child(self, exploration):
+        """
+        Returns the child maximizing the UCT score.
+        """
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: (
+            child.wins / child.visits
+            + exploration * math.sqrt(log_visits / child.visits)
+        ))
+
+
+def rollout(game, board, rng):
+    """
+    Plays random moves from board until the game ends, returning its utility.
+    """
+    while not game.terminal(board):
+        board = game.result(board, rng.choice(sorted(game.actions(board))))
+    return game.utility(board)
+
+
+def search(board, iterations=None, time_limit=None, exploration=EXPLORATION,
+           rng=None, game=ttt):
+    """
+    Grows a search tree from board and returns its root.
+
+    Stops after `iterations` playouts or `time_limit` seconds, whichever
+    comes first; with neither, runs DEFAULT_ITERATIONS playouts.
+    """
+    if iterations is None and time_limit is None:
+        iterations = DEFAULT_ITERATIONS
+    rng = rng or random.Random()
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    root = Node(game, board)
+
+    count = 0
+    while iterations is None or count < iterations:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        count += 1
+
+        # Selection: descend through fully expanded nodes.
+        node = root
+        while not node.untried and node.children:
+            node = node.uct_child(exploration)
+
+        # Expansion: add one untried move.
+        if node.untried:
+            action = node.untried.pop(rng.randrange(len(node.untried)))
+            child = Node(game, game.result(node.board, action), node, action)
+            node.children.append(child)
+            node = child
+
+        # Simulation and backpropagation.
+        value = rollout(game, node.board, rng)
+        while node is not None:
+            node.visits += 1
+            if node.parent is not None:
+                mover = game.player(node.parent.board)
+                reward = value if mover == game.X else -value
+                node.wins += (reward + 1) / 2  # win 1, draw 0.5, loss 0
+            node = node.parent
+    return root
+
+
+def root_statistics(board, iterations, time_limit, exploration, seed, game_name):
+    """
+    Runs one search and returns {action: (visits, wins)} for the root's
+    children. Module-level so it can run in a worker process.
+    """
+    game = importlib.import_module(game_name)
+    root = search(board, iterations, time_limit, exploration,
+                  random.Random(seed), game)
+    return {child.action: (child.visits, child.wins) for child in root.children}
+
+
+def mcts(board, iterations=None, time_limit=None, workers=1, seed=None,
+         exploration=EXPLORATION, game=ttt):
+    """
+    Returns the best action for the player to move on board, or None if
+    the game is over.
+
+    With workers > 1, each worker process grows its own tree from a
+    different seed with the full budget, and their root statistics are
+    summed before choosing. The move with the most visits wins, which is
+    far more stable between runs than the best average.
+    """
+    if game.terminal(board):
+        return None
+    rng = random.Random(seed)
+    seeds = [rng.randrange(2 ** 32) for _ in range(workers)]
+    args = (iterations, time_limit, exploration)
+
+    if workers == 1:
+        results = [root_statistics(board, *args, seeds[0], game.__name__)]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(root_statistics, board, *args, s, game.__name__)
+                       for s in seeds]
+            results = [future.result() for future in futures]
+
+    merged = {}
+    for statistics in results:
+        for action, (visits, wins) in statistics.items():
+            total_visits, total_wins = merged.get(action, (0, 0.0))
+            merged[action] = (total_visits + visits, total_wins + wins)
+    if not merged:
+        return random.Random(seed).choice(sorted(game.actions(board)))
+    return max(sorted(merged), key=lambda action: merged[action])
@@ -1,5 +1,7 @@
 import pygame
+import queue
 import sys
+import threading
 import time
 
 import tictactoe as ttt
@@ -19,7 +21,28 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# The AI searches in a background thread so the window keeps drawing and
+# handling events while it thinks. Each search posts its move to its own
+# queue; dropping the queue cancels the search, since whatever it finds
+# afterwards is never read.
+ai_search = None
+clock = pygame.time.Clock()
+
+
+def start_search(board):
+    """
+    Starts a minimax search on a copy of board in a daemon thread,
+    returning the queue its chosen move will be posted to.
+    """
+    results = queue.Queue(maxsize=1)
+    snapshot = [row.copy() for row in board]
+    thread = threading.Thread(
+        target=lambda: results.put(ttt.minimax(snapshot)), daemon=True
+    )
+    thread.start()
+    return results
+
 
 while True:
 
@@ -110,13 +133,16 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
+            if ai_search is None:
+                ai_search = start_search(board)
             else:
-                ai_turn = True
+                try:
+                    move = ai_search.get_nowait()
+                except queue.Empty:
+                    pass
+                else:
+                    board = ttt.result(board, move)
+                    ai_search = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -141,6 +167,7 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    ai_search = None
 
     pygame.display.flip()
+    clock.tick(60)
@@ -4,6 +4,7 @@ Tic Tac Toe Player
 
 import math
 import copy
+import time
 
 X = "X"
 O = "O"
@@ -65,7 +66,7 @@ def winner(board):
     # check all rows for possible winners.
     for row in range(3):
         row_list = board[row]
-        if row_list.count(row_list[0]) == 3:
+        if row_list[0] != EMPTY and row_list.count(row_list[0]) == 3:
             return row_list[0]
 
     # check all columns for possible winners.
@@ -73,11 +74,13 @@ def winner(board):
         col_list = []
         for row in range(3):
             col_list += [board[row][col]]
-        if col_list.count(col_list[0]) == 3:  # there are 3 X's or O's in one of the cols
+        if col_list[0] != EMPTY and col_list.count(col_list[0]) == 3:  # there are 3 X's or O's in one of the cols
             return col_list[0]
 
     # check two diagonals for possible winners
-    # TODO: Double check if there are any diagonal edge cases not covered by these.
+    # An empty line is not a win, so an empty center rules out both diagonals.
+    if board[1][1] == EMPTY:
+        return None
     if (board[0][0] == board[1][1]) and (board[1][1] == board[2][2]):
         return board[1][1]  # arbitrary, can be any of these 3 vals.
     if (board[0][2] == board[1][1]) and (board[1][1] == board[2][0]):
@@ -90,6 +93,8 @@ def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
+    if winner(board) is not None:
+        return True
     open_spaces = 0
     for row in range(3):
         for col in range(3):
@@ -111,62 +116,157 @@ def utility(board):
         return 0
 
 
-def minimax(board):
+class SearchStats():
+    """
+    Counters collected during a minimax search. Pass an instance to
+    minimax to have it filled in; searches run without one pay nothing.
+    """
+
+    def __init__(self):
+        self.nodes = 0          # boards visited by min_value/max_value
+        self.terminals = 0      # terminal boards scored with utility
+        self.cutoffs = 0        # loops abandoned once a bound was reached
+        self.cache_hits = 0     # boards whose value was already known
+        self.cache_misses = 0   # boards that had to be searched
+        self.max_depth = 0      # deepest ply reached below the root
+        self.elapsed = 0.0      # seconds spent inside minimax
+
+    def __repr__(self):
+        return (f"SearchStats(nodes={self.nodes}, terminals={self.terminals}, "
+                f"cutoffs={self.cutoffs}, cache_hits={self.cache_hits}, "
+                f"cache_misses={self.cache_misses}, max_depth={self.max_depth}, "
+                f"elapsed={self.elapsed:.6f})")
+
+    def visit(self, depth):
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+
+def minimax(board, stats=None, callback=None):
     """
     Given a state s:
 
     The maximizing player picks action a in Actions(s) that produces the highest value of Min-Value(Result(s, a)).
     The minimizing player picks action a in Actions(s) that produces the lowest value of Max-Value(Result(s, a)).
+
+    If stats (a SearchStats) is given it is filled in during the search.
+    If callback is given it is called with the stats once the move is chosen,
+    using a fresh SearchStats when none was passed.
     """
     if terminal(board):
         return None
 
+    if callback is not None and stats is None:
+        stats = SearchStats()
+    if stats is not None:
+        start = time.perf_counter()
+    cache = {}  # exact values of boards already searched during this call
+
     if player(board) == X:
         possibilities = [(result(board, action), action) for action in actions(board)]
         best_action = possibilities[0][1]  # first value of first tuple
-        max_act = min_value(possibilities[0][0], -math.inf)  # unsure if this is right way to indicate
+        max_act = min_value(possibilities[0][0], -math.inf, stats, cache)
         possibilities.remove(possibilities[0])
 
         for possible_board in possibilities:
-            current_min = min_value(possible_board[0], max_act)
+            current_min = min_value(possible_board[0], max_act, stats, cache)
             if max_act > current_min:
                 continue
             else:
                 max_act = current_min
                 best_action = possible_board[1]
-        return best_action
 
-    if player(board) == O:
+    else:
         possibilities = [(result(board, action), action) for action in actions(board)]
         best_action = possibilities[0][1]
-        min_act = max_value(possibilities[0][0], math.inf)
+        min_act = max_value(possibilities[0][0], math.inf, stats, cache)
         possibilities.remove(possibilities[0])
 
         for possible_board in possibilities:
-            current_max = max_value(possible_board[0], min_act)
+            current_max = max_value(possible_board[0], min_act, stats, cache)
             if min_act < current_max:
                 continue
             else:
                 min_act = current_max  # number to compare to
                 best_action = possible_board[1]
-        return best_action  # == min_act
 
+    if stats is not None:
+        stats.elapsed += time.perf_counter() - start
+        if callback is not None:
+            callback(stats)
+    return best_action
 
-def min_value(board, curr_min):
-    v = math.inf
+
+def board_key(board):
+    """
+    Returns a hashable snapshot of board, for use as a cache key.
+    """
+    return tuple(tuple(row) for row in board)
+
+
+def min_value(board, curr_min, stats=None, cache=None, depth=1):
+    """
+    Returns the value of board with the minimizing player to move.
+    curr_min is the value the maximizer is already guaranteed elsewhere:
+    once this board is known to be worse than that, the remaining
+    moves cannot matter and the search stops early.
+    """
+    if stats is not None:
+        stats.visit(depth)
     if terminal(board):
+        if stats is not None:
+            stats.terminals += 1
         return utility(board)
+    if cache is not None:
+        key = board_key(board)
+        if key in cache:
+            if stats is not None:
+                stats.cache_hits += 1
+            return cache[key]
+        if stats is not None:
+            stats.cache_misses += 1
+
+    v = math.inf
     for action in actions(board):
-        # if v > curr_min:
-        v = min(v, max_value(result(board, action), curr_min))
+        v = min(v, max_value(result(board, action), v, stats, cache, depth + 1))
+        if v < curr_min:
+            if stats is not None:
+                stats.cutoffs += 1
+            return v  # only a bound, so it is not cached
+    if cache is not None:
+        cache[key] = v
     return v
 
 
-def max_value(board, curr_max):
-    v = -math.inf
+def max_value(board, curr_max, stats=None, cache=None, depth=1):
+    """
+    Returns the value of board with the maximizing player to move.
+    curr_max is the value the minimizer is already guaranteed elsewhere,
+    used to stop early like curr_min in min_value.
+    """
+    if stats is not None:
+        stats.visit(depth)
     if terminal(board):
+        if stats is not None:
+            stats.terminals += 1
         return utility(board)
+    if cache is not None:
+        key = board_key(board)
+        if key in cache:
+            if stats is not None:
+                stats.cache_hits += 1
+            return cache[key]
+        if stats is not None:
+            stats.cache_misses += 1
+
+    v = -math.inf
     for action in actions(board):
-        # if v < curr_max:  # may not work!
-        v = max(v, min_value(result(board, action), curr_max))
+        v = max(v, min_value(result(board, action), v, stats, cache, depth + 1))
+        if v > curr_max:
+            if stats is not None:
+                stats.cutoffs += 1
+            return v  # only a bound, so it is not cached
+    if cache is not None:
+        cache[key] = v
     return v
@@ -0,0 +1,207 @@
+"""
+Headless self-play tournament and engine benchmark for Tic Tac Toe.
+
+Plays every ordered pairing of the chosen engines against each other across
+a process pool, then reports results, per-move latency percentiles and
+nodes searched per second. Exits with status 1 if minimax ever loses.
+
+Usage: python tournament.py [--games N] [--workers N] [--engines NAME ...]
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import itertools
+import random
+import sys
+import time
+
+import mcts
+import tictactoe as ttt
+
+
+@contextlib.contextmanager
+def counting_results():
+    """
+    Counts the boards generated by tictactoe.result inside the block,
+    yielding a one-item list that holds the count. The original function
+    is put back on exit.
+    """
+    result = ttt.result
+    count = [0]
+
+    def counted_result(board, action):
+        count[0] += 1
+        return result(board, action)
+
+    ttt.result = counted_result
+    try:
+        yield count
+    finally:
+        ttt.result = result
+
+
+# Engines return (move, nodes), where nodes is the number of boards they
+# searched. Engines that do not search report 0.
+
+def random_engine(board, rng):
+    """
+    Plays a uniformly random legal move.
+    """
+    return rng.choice(sorted(ttt.actions(board))), 0
+
+
+def greedy_engine(board, rng):
+    """
+    Wins if it can, blocks an immediate loss if it must, otherwise
+    prefers the center, then corners, then any remaining move.
+    """
+    moves = sorted(ttt.actions(board))
+    me = ttt.player(board)
+    for move in moves:
+        if ttt.winner(ttt.result(board, move)) == me:
+            return move, 0
+    for move in moves:
+        blocked = [row.copy() for row in board]
+        blocked[move[0]][move[1]] = ttt.O if me == ttt.X else ttt.X
+        if ttt.winner(blocked) is not None:
+            return move, 0
+    for preferred in ([(1, 1)], [(0, 0), (0, 2), (2, 0), (2, 2)]):
+        options = [move for move in preferred if move in moves]
+        if options:
+            return rng.choice(options), 0
+    return rng.choice(moves), 0
+
+
+def minimax_engine(board, rng):
+    """
+    Plays the move chosen by tictactoe.minimax, counting the boards
+    visited by its search.
+    """
+    stats = ttt.SearchStats()
+    return ttt.minimax(board, stats), stats.nodes
+
+
+def mcts_engine(board, rng):
+    """
+    Plays the move chosen by a single-process Monte Carlo Tree Search,
+    counting the boards generated by its tree and playouts.
+    """
+    with counting_results() as count:
+        move = mcts.mcts(board, seed=rng.randrange(2 ** 32))
+    return move, count[0]
+
+
+ENGINES = {
+    "minimax": minimax_engine,
+    "mcts": mcts_engine,
+    "random": random_engine,
+    "greedy": greedy_engine,
+}
+
+
+def play_game(x_engine, o_engine, seed):
+    """
+    Plays one game and returns (x_engine, o_engine, winner, moves), where
+    moves is a list of (engine, seconds, nodes) for every move made.
+    """
+    rng = random.Random(seed)
+    engines = {ttt.X: x_engine, ttt.O: o_engine}
+    board = ttt.initial_state()
+    moves = []
+    while not ttt.terminal(board):
+        name = engines[ttt.player(board)]
+        start = time.perf_counter()
+        move, nodes = ENGINES[name](board, rng)
+        elapsed = time.perf_counter() - start
+        moves.append((name, elapsed, nodes))
+        board = ttt.result(board, move)
+    return x_engine, o_engine, ttt.winner(board), moves
+
+
+def percentile(values, fraction):
+    """
+    Returns the value at the given fraction of the sorted values,
+    interpolating linearly between neighbours.
+    """
+    values = sorted(values)
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def run_tournament(engines, games, workers=None, seed=0):
+    """
+    Plays `games` games for every ordered pairing of engines, including
+    self-play, and returns the list of play_game results.
+    """
+    pairings = list(itertools.product(engines, repeat=2))
+    jobs = [(x, o, seed + n) for n, (x, o) in
+            enumerate(pairing for pairing in pairings for _ in range(games))]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(play_game, *zip(*jobs), chunksize=8))
+
+
+def report(results):
+    """
+    Prints pairing results and engine statistics, returning the number
+    of games minimax lost.
+    """
+    print(f"{'X':>10} {'O':>10} {'X wins':>8} {'O wins':>8} {'draws':>8}")
+    tally = {}
+    losses = 0
+    for x_engine, o_engine, winner, _ in results:
+        counts = tally.setdefault((x_engine, o_engine), {ttt.X: 0, ttt.O: 0, None: 0})
+        counts[winner] += 1
+        if ((winner == ttt.O and x_engine == "minimax")
+                or (winner == ttt.X and o_engine == "minimax")):
+            losses += 1
+    for (x_engine, o_engine), counts in tally.items():
+        print(f"{x_engine:>10} {o_engine:>10} "
+              f"{counts[ttt.X]:>8} {counts[ttt.O]:>8} {counts[None]:>8}")
+
+    print()
+    print(f"{'engine':>10} {'moves':>8} {'p50 ms':>9} {'p90 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9} {'nodes/s':>12}")
+    moves = {}
+    for _, _, _, game_moves in results:
+        for name, elapsed, nodes in game_moves:
+            moves.setdefault(name, []).append((elapsed, nodes))
+    for name, samples in moves.items():
+        latencies = [elapsed for elapsed, _ in samples]
+        total_time = sum(latencies)
+        total_nodes = sum(nodes for _, nodes in samples)
+        rate = total_nodes / total_time if total_time else 0.0
+        print(f"{name:>10} {len(samples):>8} "
+              f"{percentile(latencies, 0.5) * 1000:>9.3f} "
+              f"{percentile(latencies, 0.9) * 1000:>9.3f} "
+              f"{percentile(latencies, 0.99) * 1000:>9.3f} "
+              f"{max(latencies) * 1000:>9.3f} {rate:>12.0f}")
+    return losses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=10,
+                        help="games per ordered pairing of engines")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES),
+                        default=["minimax", "random", "greedy"])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_tournament(args.engines, args.games, args.workers, args.seed)
+    print(f"Played {len(results)} games in {time.perf_counter() - start:.2f}s\n")
+    losses = report(results)
+    if losses:
+        print(f"\nminimax lost {losses} game(s); perfect play should never lose.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
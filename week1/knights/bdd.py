@@ -0,0 +1,239 @@
+"""
+Reduced ordered binary decision diagrams for logic sentences.
+
+A BDD manager owns every node it creates. Nodes are integers: 0 is false,
+1 is true, and any other node tests one variable and points to a low
+(false) and high (true) child. The unique table guarantees there is
+exactly one node per (variable, low, high), so equivalent functions are
+the same integer, and the apply cache means each pair of nodes is only
+combined once. After compiling a knowledge base, entailment, model
+counting and model enumeration are walks over the finished graph.
+"""
+
+FALSE = 0
+TRUE = 1
+
+
+def occurrence_order(*sentences):
+    """
+    Returns the symbols of the sentences in the order a depth-first walk
+    first meets them.
+    """
+    order = {}
+    stack = list(reversed(sentences))
+    while stack:
+        sentence = stack.pop()
+        children = sentence.children()
+        if children:
+            stack.extend(reversed(children))
+        else:
+            for name in sorted(sentence.symbol_set()):
+                order.setdefault(name)
+    return list(order)
+
+
+def force_order(*sentences, iterations=20):
+    """
+    Returns a variable order from the FORCE heuristic: starting from the
+    occurrence order, each symbol is repeatedly moved to the average
+    centre of the top-level conjuncts it appears in, so symbols that
+    constrain each other end up close together.
+    """
+    order = occurrence_order(*sentences)
+    groups = []
+    for sentence in sentences:
+        stack = [sentence]
+        while stack:
+            node = stack.pop()
+            if getattr(node, "conjuncts", None) is not None:
+                stack.extend(node.children())
+            elif len(node.symbol_set()) > 1:
+                groups.append(sorted(node.symbol_set()))
+    if not groups:
+        return order
+
+    position = {name: i for i, name in enumerate(order)}
+    for _ in range(iterations):
+        totals = {name: [0.0, 0] for name in order}
+        for group in groups:
+            centre = sum(position[name] for name in group) / len(group)
+            for name in group:
+                totals[name][0] += centre
+                totals[name][1] += 1
+        target = {name: (total / count if count else position[name], position[name])
+                  for name, (total, count) in totals.items()}
+        new_order = sorted(order, key=target.get)
+        if new_order == order:
+            break
+        order = new_order
+        position = {name: i for i, name in enumerate(order)}
+    return order
+
+
+class BDD():
+    """
+    A manager for reduced ordered BDDs over a list of symbol names, the
+    first name being tested at the root. Symbols not in the order are
+    appended when first seen.
+    """
+
+    def __init__(self, order=()):
+        self.order = []
+        self.levels = {}
+        # Terminals sit below every variable.
+        self.node_levels = [float("inf"), float("inf")]
+        self.lows = [None, None]
+        self.highs = [None, None]
+        self.unique = {}
+        self.apply_cache = {}
+        self.negate_cache = {}
+        self.built = {}
+        for name in order:
+            self.add_variable(name)
+
+    def __len__(self):
+        return len(self.node_levels)
+
+    def add_variable(self, name):
+        if name not in self.levels:
+            self.levels[name] = len(self.order)
+            self.order.append(name)
+        return self.levels[name]
+
+    def make(self, level, low, high):
+        """Returns the unique node testing level with the given children."""
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            node = len(self.node_levels)
+            self.node_levels.append(level)
+            self.lows.append(low)
+            self.highs.append(high)
+            self.unique[key] = node
+        return node
+
+    def variable(self, name):
+        """Returns the node for a single symbol."""
+        return self.make(self.add_variable(name), FALSE, TRUE)
+
+    def negate(self, u):
+        if u <= TRUE:
+            return TRUE - u
+        result = self.negate_cache.get(u)
+        if result is None:
+            result = self.make(self.node_levels[u],
+                               self.negate(self.lows[u]),
+                               self.negate(self.highs[u]))
+            self.negate_cache[u] = result
+        return result
+
+    def apply(self, op, u, v):
+        """Returns the node for u op v, where op is "and", "or" or "xor"."""
+        if op == "and":
+            if u == FALSE or v == FALSE:
+                return FALSE
+            if u == TRUE:
+                return v
+            if v == TRUE or u == v:
+                return u
+        elif op == "or":
+            if u == TRUE or v == TRUE:
+                return TRUE
+            if u == FALSE:
+                return v
+            if v == FALSE or u == v:
+                return u
+        elif op == "xor":
+            if u == FALSE:
+                return v
+            if v == FALSE:
+                return u
+            if u == v:
+                return FALSE
+            if u == TRUE:
+                return self.negate(v)
+            if v == TRUE:
+                return self.negate(u)
+        else:
+            raise ValueError(f"unknown operator {op}")
+
+        if u > v:
+            u, v = v, u
+        key = (op, u, v)
+        result = self.apply_cache.get(key)
+        if result is not None:
+            return result
+
+        level_u, level_v = self.node_levels[u], self.node_levels[v]
+        level = min(level_u, level_v)
+        u0, u1 = (self.lows[u], self.highs[u]) if level_u == level else (u, u)
+        v0, v1 = (self.lows[v], self.highs[v]) if level_v == level else (v, v)
+        result = self.make(level, self.apply(op, u0, v0), self.apply(op, u1, v1))
+        self.apply_cache[key] = result
+        return result
+
+    def build(self, sentence):
+        """Returns the node for a sentence, compiling each subsentence once."""
+        node = self.built.get(sentence)
+        if node is None:
+            node = sentence.bdd(self)
+            self.built[sentence] = node
+        return node
+
+    def entails(self, u, sentence):
+        """Checks that every model of node u satisfies sentence."""
+        return self.apply("and", u, self.negate(self.build(sentence))) == FALSE
+
+    def depth(self, u):
+        return len(self.order) if u <= TRUE else self.node_levels[u]
+
+    def count(self, u):
+        """Returns the number of models of u over all variables in the order."""
+        memo = {FALSE: 0, TRUE: 1}
+
+        def below(u):
+            # Models over the variables from u's level down
+            if u not in memo:
+                low, high = self.lows[u], self.highs[u]
+                level = self.node_levels[u]
+                memo[u] = (below(low) * 2 ** (self.depth(low) - level - 1)
+                           + below(high) * 2 ** (self.depth(high) - level - 1))
+            return memo[u]
+
+        return below(u) * 2 ** self.depth(u)
+
+    def models(self, u):
+        """Yields every model of u over all variables in the order as a dict."""
+        model = {}
+
+        def walk(u, level):
+            if u == FALSE:
+                return
+            if level == len(self.order):
+                yield dict(model)
+                return
+            name = self.order[level]
+            if self.depth(u) > level:
+                branches = ((False, u), (True, u))
+            else:
+                branches = ((False, self.lows[u]), (True, self.highs[u]))
+            for value, child in branches:
+                model[name] = value
+                yield from walk(child, level + 1)
+            del model[name]
+
+        yield from walk(u, 0)
+
+    def size(self, u):
+        """Returns the number of nodes reachable from u, terminals included."""
+        seen = set()
+        stack = [u]
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                if node > TRUE:
+                    stack.extend((self.lows[node], self.highs[node]))
+        return len(seen)
@@ -0,0 +1,180 @@
+"""
+Benchmark for the model checking backends in logic.py.
+
+Generates knights-and-knaves puzzles with any number of inhabitants and
+random 3-SAT instances near the satisfiability phase transition, asks
+every backend the same entailment queries, and reports time, nodes
+explored and peak memory per backend. Exits with status 1 if two
+backends ever disagree.
+
+Usage: python benchmark.py [--knights N ...] [--sat N ...] [--methods NAME ...]
+"""
+
+import argparse
+import importlib.util
+import random
+import sys
+import time
+import tracemalloc
+
+from logic import *
+
+METHODS = ["enumerate", "compiled", "parallel", "truthtable", "bdd", "sat"]
+
+# Methods that look at every model, so are only run on small instances.
+EXHAUSTIVE = {"compiled", "parallel", "truthtable"}
+
+# Clauses per variable where random 3-SAT goes from mostly satisfiable
+# to mostly unsatisfiable.
+PHASE_TRANSITION = 4.26
+
+
+def knights_puzzle(n, seed=None):
+    """
+    Returns (knowledge, queries) for a puzzle with n inhabitants, each of
+    whom makes one statement about the others. Statements are chosen to
+    fit a hidden assignment, so the puzzle always has a solution. The
+    queries ask whether each inhabitant is a knight and whether a knave.
+    """
+    rng = random.Random(seed)
+    names = [f"P{i}" for i in range(n)]
+    knight = {name: Symbol(f"{name} is a Knight") for name in names}
+    knave = {name: Symbol(f"{name} is a Knave") for name in names}
+    hidden = {name: rng.random() < 0.5 for name in names}
+
+    def says(speaker):
+        others = [name for name in names if name != speaker] or [speaker]
+        a, b = rng.choice(others), rng.choice(names)
+        kind = rng.randrange(5)
+        if kind == 0:
+            return knight[a], hidden[a]
+        elif kind == 1:
+            return knave[a], not hidden[a]
+        elif kind == 2:
+            return Biconditional(knight[a], knight[b]), hidden[a] == hidden[b]
+        elif kind == 3:
+            return Or(knave[a], knave[b]), not (hidden[a] and hidden[b])
+        return And(knave[speaker], knight[a]), not hidden[speaker] and hidden[a]
+
+    sentences = []
+    for name in names:
+        statement, true = says(name)
+        if true != hidden[name]:
+            statement = Not(statement)
+        sentences.extend([
+            Or(knight[name], knave[name]),
+            Not(And(knight[name], knave[name])),
+            Implication(knight[name], statement),
+            Implication(knave[name], Not(statement)),
+        ])
+    queries = [symbol for name in names for symbol in (knight[name], knave[name])]
+    return And(*sentences), queries
+
+
+def random_3sat(n, ratio=PHASE_TRANSITION, queries=4, seed=None):
+    """
+    Returns (knowledge, queries) for a random 3-SAT instance over n
+    variables with round(ratio * n) clauses, each over three different
+    variables. The queries are random literals.
+    """
+    rng = random.Random(seed)
+    symbols = [Symbol(f"x{i}") for i in range(1, n + 1)]
+
+    def literal(symbol):
+        return symbol if rng.random() < 0.5 else Not(symbol)
+
+    clauses = [Or(*map(literal, rng.sample(symbols, 3)))
+               for _ in range(round(ratio * n))]
+    return And(*clauses), [literal(rng.choice(symbols)) for _ in range(queries)]
+
+
+def run(knowledge, queries, method, memory=True):
+    """
+    Asks every query with one method. Returns (results, seconds, nodes,
+    peak), where nodes is None if the method does not count them and peak
+    is the most memory allocated in bytes, or None without memory.
+    """
+    results = []
+    nodes = 0
+    stats = {}
+    start = time.perf_counter()
+    for query in queries:
+        results.append(model_check(knowledge, query, method, stats=stats))
+        if nodes is not None:
+            nodes = nodes + stats["nodes"] if "nodes" in stats else None
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        # A second pass, since tracing slows allocation down a lot
+        tracemalloc.start()
+        for query in queries:
+            model_check(knowledge, query, method)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return results, seconds, nodes, peak
+
+
+def benchmark(instances, methods, max_symbols=20, memory=True):
+    """
+    Runs every method on every (name, knowledge, queries) instance and
+    prints a table. Returns the names of instances the methods disagreed on.
+    """
+    print(f"{'instance':>16} {'symbols':>8} {'method':>11} {'seconds':>9} "
+          f"{'nodes':>10} {'peak KiB':>9} {'entailed':>9}")
+    disagreements = []
+    for name, knowledge, queries in instances:
+        symbols = len(knowledge.symbol_set().union(*[q.symbol_set() for q in queries]))
+        answers = {}
+        for method in methods:
+            if method in EXHAUSTIVE and symbols > max_symbols:
+                print(f"{name:>16} {symbols:>8} {method:>11} {'skipped':>9}")
+                continue
+            results, seconds, nodes, peak = run(knowledge, queries, method, memory)
+            answers[method] = results
+            print(f"{name:>16} {symbols:>8} {method:>11} {seconds:>9.4f} "
+                  f"{'-' if nodes is None else nodes:>10} "
+                  f"{'-' if peak is None else peak // 1024:>9} "
+                  f"{sum(results):>4}/{len(results):<4}")
+        if len(set(map(tuple, answers.values()))) > 1:
+            disagreements.append(name)
+    return disagreements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--knights", type=int, nargs="*", default=[3, 6, 9],
+                        help="inhabitants in each knights-and-knaves puzzle")
+    parser.add_argument("--sat", type=int, nargs="*", default=[10, 20, 30],
+                        help="variables in each random 3-SAT instance")
+    parser.add_argument("--ratio", type=float, default=PHASE_TRANSITION,
+                        help="clauses per variable in 3-SAT instances")
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=None,
+                        help="backends to compare (default: all but parallel)")
+    parser.add_argument("--max-symbols", type=int, default=20,
+                        help="largest instance to run exhaustive methods on")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the tracemalloc pass")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    methods = args.methods
+    if methods is None:
+        methods = [method for method in METHODS if method != "parallel"]
+        if importlib.util.find_spec("numpy") is None:
+            methods.remove("truthtable")
+
+    instances = []
+    for n in args.knights:
+        instances.append((f"knights-{n}", *knights_puzzle(n, args.seed + n)))
+    for n in args.sat:
+        instances.append((f"3sat-{n}", *random_3sat(n, args.ratio, seed=args.seed + n)))
+
+    disagreements = benchmark(instances, methods, args.max_symbols, not args.no_memory)
+    if disagreements:
+        print(f"\nBackends disagreed on: {', '.join(disagreements)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Reading and writing knowledge bases in bulk.
+
+Two formats are supported. The first is the text syntax produced by
+Sentence.formula(), with one sentence per line; ASCII ~, &, | are
+accepted for ¬, ∧, ∨, and ⊤ and ⊥ stand for true and false. The second
+is DIMACS CNF, where variable names are kept in "c var <n> <name>"
+comment lines so a knowledge base survives a round trip. Every variable
+is named, including the extra variables of the Tseitin encoding, which
+get a prefix no symbol name starts with.
+"""
+
+import re
+
+from logic import (And, Biconditional, CNF, FALSE, Implication, Not, Or,
+                   Sentence, Symbol, TRUE)
+
+TOKEN = re.compile(r"(<=>|=>|[¬∧∨~&|()⊤⊥])")
+NOT = {"¬", "~"}
+AND = {"∧", "&"}
+OR = {"∨", "|"}
+CONSTANTS = {"⊤": TRUE, "⊥": FALSE}
+OPERATORS = NOT | AND | OR | {"=>", "<=>", "(", ")"}
+
+# Lines without these are at most a disjunction of literals
+NOT_CLAUSE = re.compile(r"=>|[∧&⊤⊥]")
+DISJUNCTION = re.compile(r"[∨|]")
+
+
+class ParseError(Exception):
+    pass
+
+
+class Parser():
+    """
+    Recursive descent parser for one formula. From loosest to tightest
+    binding: <=>, => (right associative), ∨, ∧, ¬. Anything between
+    operators, other than ⊤ and ⊥, is a symbol name with surrounding
+    spaces removed.
+    """
+
+    def __init__(self, text, symbols):
+        self.tokens = [token.strip() for token in TOKEN.split(text)]
+        self.tokens = [token for token in self.tokens if token]
+        self.position = 0
+        self.symbols = symbols
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def take(self):
+        token = self.peek()
+        if token is None:
+            raise ParseError("unexpected end of formula")
+        self.position += 1
+        return token
+
+    def parse(self):
+        sentence = self.biconditional()
+        if self.peek() is not None:
+            raise ParseError(f"unexpected {self.peek()!r}")
+        return sentence
+
+    def biconditional(self):
+        left = self.implication()
+        while self.peek() == "<=>":
+            self.take()
+            left = Biconditional(left, self.implication())
+        return left
+
+    def implication(self):
+        antecedent = self.disjunction()
+        if self.peek() == "=>":
+            self.take()
+            return Implication(antecedent, self.implication())
+        return antecedent
+
+    def disjunction(self):
+        disjuncts = [self.conjunction()]
+        while self.peek() in OR:
+            self.take()
+            disjuncts.append(self.conjunction())
+        return disjuncts[0] if len(disjuncts) == 1 else Or(*disjuncts)
+
+    def conjunction(self):
+        conjuncts = [self.negation()]
+        while self.peek() in AND:
+            self.take()
+            conjuncts.append(self.negation())
+        return conjuncts[0] if len(conjuncts) == 1 else And(*conjuncts)
+
+    def negation(self):
+        token = self.take()
+        if token in NOT:
+            return Not(self.negation())
+        if token == "(":
+            sentence = self.biconditional()
+            if self.take() != ")":
+                raise ParseError("expected ')'")
+            return sentence
+        if token in CONSTANTS:
+            return CONSTANTS[token]
+        if token in OPERATORS:
+            raise ParseError(f"unexpected {token!r}")
+        symbol = self.symbols.get(token)
+        if symbol is None:
+            symbol = self.symbols[token] = Symbol(token)
+        return symbol
+
+
+def parse_literal(text, symbols):
+    """
+    Returns the symbol or negated symbol in text, with any parentheses
+    around either removed, or None if text is anything else.
+    """
+    name = text.strip()
+    while name[:1] == "(" and name[-1:] == ")":
+        name = name[1:-1].strip()
+    negated = name[:1] in NOT
+    if negated:
+        name = name[1:].strip()
+        while name[:1] == "(" and name[-1:] == ")":
+            name = name[1:-1].strip()
+    if not name or "(" in name or ")" in name or "¬" in name or "~" in name:
+        return None
+    symbol = symbols.get(name)
+    if symbol is None:
+        symbol = symbols[name] = Symbol(name)
+    return Not(symbol) if negated else symbol
+
+
+def parse_clause(text, symbols, literals):
+    """
+    Returns the sentence in text if it is a disjunction of literals, or
+    None for anything else. Much faster than Parser on the long CNF
+    knowledge bases dumps writes, since literals maps the text of each
+    literal already seen to its sentence.
+    """
+    if NOT_CLAUSE.search(text):
+        return None
+    disjuncts = []
+    for part in DISJUNCTION.split(text):
+        sentence = literals.get(part)
+        if sentence is None:
+            sentence = parse_literal(part, symbols)
+            if sentence is None:
+                return None
+            literals[part] = sentence
+        disjuncts.append(sentence)
+    return disjuncts[0] if len(disjuncts) == 1 else Or(*disjuncts)
+
+
+def parse(text, symbols=None, literals=None):
+    """
+    Returns the sentence written in formula syntax in text. Disjunctions
+    of literals skip the general parser.
+    """
+    symbols = {} if symbols is None else symbols
+    sentence = parse_clause(text, symbols, {} if literals is None else literals)
+    if sentence is None:
+        sentence = Parser(text, symbols).parse()
+    return sentence
+
+
+def loads(text):
+    """
+    Returns the knowledge base written one sentence per line in text, as
+    an And of those sentences. Blank lines and lines starting with # are
+    skipped.
+    """
+    symbols = {}
+    literals = {}
+    sentences = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            sentences.append(parse(line, symbols, literals))
+        except ParseError as e:
+            raise ParseError(f"line {number}: {e}")
+    return And(*sentences)
+
+
+def load(path):
+    """Returns the knowledge base stored one sentence per line in a file."""
+    with open(path, encoding="utf-8") as f:
+        return loads(f.read())
+
+
+def conjuncts(knowledge):
+    """Returns the top-level conjuncts of a knowledge base."""
+    if isinstance(knowledge, And):
+        return knowledge.conjuncts
+    return [knowledge]
+
+
+def dumps(knowledge):
+    """Returns the knowledge base as text, one top-level conjunct per line."""
+    Sentence.validate(knowledge)
+    return "".join(sentence.formula() + "\n" for sentence in conjuncts(knowledge))
+
+
+def dump(knowledge, path):
+    """Writes the knowledge base to a file, one top-level conjunct per line."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps(knowledge))
+
+
+def fresh_prefix(names, prefix):
+    """
+    Returns prefix, with underscores put in front until no name starts
+    with it.
+    """
+    while any(name.startswith(prefix) for name in names):
+        prefix = "_" + prefix
+    return prefix
+
+
+def loads_dimacs(text):
+    """
+    Returns the DIMACS CNF in text as an And of Or clauses. Variables named
+    in "c var <n> <name>" comments get that name, the rest are named "x<n>",
+    with underscores in front if a named variable starts with "x".
+    """
+    names = {}
+    body = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("c"):
+            parts = line.split(None, 3)
+            if len(parts) == 4 and parts[1] == "var":
+                names[int(parts[2])] = parts[3]
+        elif line.startswith("%"):
+            break  # SATLIB files end with "%" and a stray "0"
+        elif not line.startswith("p"):
+            body.append(line)
+
+    literals = {}
+    unnamed = fresh_prefix(names.values(), "x") if names else "x"
+
+    def literal(n):
+        sentence = literals.get(n)
+        if sentence is None:
+            if n > 0:
+                sentence = Symbol(names.get(n, f"{unnamed}{n}"))
+            else:
+                sentence = Not(literal(-n))
+            literals[n] = sentence
+        return sentence
+
+    clauses = []
+    clause = []
+    for token in " ".join(body).split():
+        n = int(token)
+        if n == 0:
+            clauses.append(Or(*clause))
+            clause = []
+        else:
+            clause.append(literals.get(n) or literal(n))
+    if clause:
+        clauses.append(Or(*clause))
+    return And(*clauses)
+
+
+def load_dimacs(path):
+    """Returns the DIMACS CNF stored in a file as an And of Or clauses."""
+    with open(path, encoding="utf-8") as f:
+        return loads_dimacs(f.read())
+
+
+class ClauseList():
+    """Collects the clauses of a CNF encoding instead of solving them."""
+
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []
+
+    def new_var(self):
+        self.num_vars += 1
+        return self.num_vars
+
+    def add_clause(self, literals):
+        self.clauses.append(list(literals))
+
+
+def dumps_dimacs(knowledge):
+    """
+    Returns the knowledge base as DIMACS CNF. Clauses that are not already
+    disjunctions of literals are Tseitin-encoded with extra variables.
+    """
+    Sentence.validate(knowledge)
+    sink = ClauseList()
+    cnf = CNF(sink)
+    cnf.add(knowledge)
+    names = {var: name for name, var in cnf.variables.items()}
+    extra = fresh_prefix(names.values(), "t")
+    lines = [f"p cnf {sink.num_vars} {len(sink.clauses)}"]
+    lines.extend(f"c var {var} {names.get(var, f'{extra}{var}')}"
+                 for var in range(1, sink.num_vars + 1))
+    lines.extend(" ".join(map(str, clause)) + " 0" for clause in sink.clauses)
+    return "\n".join(lines) + "\n"
+
+
+def dump_dimacs(knowledge, path):
+    """Writes the knowledge base to a file as DIMACS CNF."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps_dimacs(knowledge))
@@ -1,25 +1,152 @@
+import concurrent.futures
 import itertools
+import multiprocessing
+import os
+import weakref
 
+from bdd import BDD, force_order, occurrence_order
+from sat import Solver
 
-class Sentence():
+
+class SentenceType(type):
+    """
+    Metaclass hash-consing sentences: constructing a sentence equal to one
+    that is still alive returns the existing object, so identical
+    subformulas are stored once and compare by identity.
+
+    Only sentences that can never change are shared. And can grow with
+    add, so an And, and anything built from one, is always a new object.
+    Classes with `shared` False are never looked up or stored.
+    """
+
+    table = weakref.WeakValueDictionary()
+
+    def __call__(cls, *args):
+        if not cls.shared:
+            return super().__call__(*args)
+        key = (cls,) + args
+        try:
+            return SentenceType.table[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable arguments are not sentences; let __init__ reject them.
+            return super().__call__(*args)
+        sentence = super().__call__(*args)
+        if sentence._hash is not None:
+            SentenceType.table[key] = sentence
+        return sentence
+
+
+class Sentence(metaclass=SentenceType):
+
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    # Distinguishes the hashes of sentence types with the same children
+    tag = None
+
+    # Whether equal sentences of this class are interned as one object
+    shared = True
+
+    def __init__(self):
+        self._hash = None
+        self._symbols = None
+
+    def __hash__(self):
+        if self._hash is not None:
+            return self._hash
+        return self.structural_hash()
+
+    def structural_hash(self):
+        """Returns the hash worked out from the sentence's children."""
+        return hash((self.tag, tuple(map(hash, self.children()))))
+
+    def freeze(self):
+        """
+        Caches the sentence's hash, unless some subsentence can still
+        change, in which case the hash and symbols are worked out again
+        on every call and the sentence is not shared.
+        """
+        self._symbols = None
+        if any(child._hash is None for child in self.children()):
+            self._hash = None
+        else:
+            self._hash = self.structural_hash()
+
+    def __reduce__(self):
+        # Rebuild through the constructor so the copy is interned and its
+        # hash is recomputed for the receiving process.
+        return (type(self), self.children())
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave symbols
+        unassigned, returning None if the value depends on them.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """Returns a cached frozenset of all symbols in the sentence."""
+        if self._symbols is not None:
+            return self._symbols
+        symbols = frozenset().union(
+            *[child.symbol_set() for child in self.children()]
+        )
+        if self._hash is not None:
+            self._symbols = symbols
+        return symbols
+
+    def children(self):
+        """Returns a tuple of the sentence's immediate subsentences."""
+        return ()
+
+    def code(self, compiler):
+        """Returns a Python expression evaluating the sentence."""
+        raise Exception("nothing to compile")
+
+    def compile(self, symbols=None):
+        """Returns a CompiledSentence evaluating the sentence."""
+        return CompiledSentence(self, symbols)
+
+    def tseitin(self, cnf):
+        """Adds Tseitin clauses defining the sentence, returning its literal."""
+        raise Exception("nothing to encode")
+
+    def bitwise(self, table):
+        """Returns the sentence's packed truth column in a TruthTable chunk."""
+        raise Exception("nothing to evaluate")
+
+    def bdd(self, manager):
+        """Returns the node representing the sentence in a BDD manager."""
+        raise Exception("nothing to compile")
+
+    def simplify(self, simplifier):
+        """Returns an equivalent, simpler sentence."""
+        return self
 
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
             raise TypeError("must be a logical sentence")
 
+    @classmethod
+    def validate_all(cls, sentences):
+        for sentence in sentences:
+            if not isinstance(sentence, Sentence):
+                raise TypeError("must be a logical sentence")
+
     @classmethod
     def parenthesize(cls, s):
         """Parenthesizes an expression if not already parenthesized."""
@@ -44,14 +171,22 @@ class Sentence():
 
 class Symbol(Sentence):
 
+    __slots__ = ("name",)
+
     def __init__(self, name):
         self.name = name
+        self._hash = hash(("symbol", name))
+        self._symbols = frozenset([name])
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name)
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self._hash
+
+    def __reduce__(self):
+        return (Symbol, (self.name,))
 
     def __repr__(self):
         return self.name
@@ -62,23 +197,49 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def code(self, compiler):
+        return compiler.slot(self.name)
+
+    def tseitin(self, cnf):
+        return cnf.variable(self.name)
+
+    def bitwise(self, table):
+        try:
+            return table.columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
+    def bdd(self, manager):
+        return manager.variable(self.name)
+
+    def simplify(self, simplifier):
+        if self.name in simplifier.units:
+            return TRUE if simplifier.units[self.name] else FALSE
+        return self
 
 
 class Not(Sentence):
+
+    __slots__ = ("operand",)
+    tag = "not"
+
     def __init__(self, operand):
         Sentence.validate(operand)
         self.operand = operand
+        self.freeze()
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand)
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -86,26 +247,49 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def children(self):
+        return (self.operand,)
+
+    def code(self, compiler):
+        return f"(not {compiler.expression(self.operand)})"
+
+    def tseitin(self, cnf):
+        return -cnf.literal(self.operand)
+
+    def bitwise(self, table):
+        return ~table.column(self.operand)
+
+    def bdd(self, manager):
+        return manager.negate(manager.build(self.operand))
+
+    def simplify(self, simplifier):
+        return simplifier.negate(simplifier.simplify(self.operand))
 
 
 class And(Sentence):
+
+    __slots__ = ("conjuncts",)
+    tag = "and"
+
     def __init__(self, *conjuncts):
-        for conjunct in conjuncts:
-            Sentence.validate(conjunct)
+        Sentence.validate_all(conjuncts)
         self.conjuncts = list(conjuncts)
+        # add changes the conjuncts, so the hash is never cached
+        self._hash = None
+        self._symbols = None
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts)
 
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -120,29 +304,78 @@ class And(Sentence):
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
+        if not self.conjuncts:
+            return "⊤"
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def children(self):
+        return tuple(self.conjuncts)
+
+    def code(self, compiler):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(compiler.expression(conjunct)
+                                  for conjunct in self.conjuncts) + ")"
+
+    def tseitin(self, cnf):
+        if not self.conjuncts:
+            return cnf.constant(True)
+        literals = [cnf.literal(conjunct) for conjunct in self.conjuncts]
+        x = cnf.new_var()
+        for lit in literals:
+            cnf.add_clause([-x, lit])
+        cnf.add_clause([x] + [-lit for lit in literals])
+        return x
+
+    def bitwise(self, table):
+        column = table.ones
+        for conjunct in self.conjuncts:
+            column = column & table.column(conjunct)
+        return column
+
+    def bdd(self, manager):
+        node = 1
+        for conjunct in self.conjuncts:
+            node = manager.apply("and", node, manager.build(conjunct))
+            if node == 0:
+                break
+        return node
+
+    def simplify(self, simplifier):
+        return simplifier.conjoin(
+            simplifier.simplify(conjunct) for conjunct in self.conjuncts
+        )
 
 
 class Or(Sentence):
+
+    __slots__ = ("disjuncts",)
+    tag = "or"
+
     def __init__(self, *disjuncts):
-        for disjunct in disjuncts:
-            Sentence.validate(disjunct)
+        Sentence.validate_all(disjuncts)
         self.disjuncts = list(disjuncts)
+        self.freeze()
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and self.disjuncts == other.disjuncts)
 
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -151,30 +384,82 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
+        if not self.disjuncts:
+            return "⊥"
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def children(self):
+        return tuple(self.disjuncts)
+
+    def code(self, compiler):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(compiler.expression(disjunct)
+                                 for disjunct in self.disjuncts) + ")"
+
+    def tseitin(self, cnf):
+        if not self.disjuncts:
+            return cnf.constant(False)
+        literals = [cnf.literal(disjunct) for disjunct in self.disjuncts]
+        x = cnf.new_var()
+        for lit in literals:
+            cnf.add_clause([x, -lit])
+        cnf.add_clause([-x] + literals)
+        return x
+
+    def bitwise(self, table):
+        column = table.zeros
+        for disjunct in self.disjuncts:
+            column = column | table.column(disjunct)
+        return column
+
+    def bdd(self, manager):
+        node = 0
+        for disjunct in self.disjuncts:
+            node = manager.apply("or", node, manager.build(disjunct))
+            if node == 1:
+                break
+        return node
+
+    def simplify(self, simplifier):
+        return simplifier.disjoin(
+            simplifier.simplify(disjunct) for disjunct in self.disjuncts
+        )
 
 
 class Implication(Sentence):
+
+    __slots__ = ("antecedent", "consequent")
+    tag = "implies"
+
     def __init__(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
+        self.freeze()
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent)
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -183,29 +468,71 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is True and consequent is False:
+            return False
+        return None
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def children(self):
+        return (self.antecedent, self.consequent)
+
+    def code(self, compiler):
+        antecedent = compiler.expression(self.antecedent)
+        consequent = compiler.expression(self.consequent)
+        return f"((not {antecedent}) or {consequent})"
+
+    def tseitin(self, cnf):
+        antecedent = cnf.literal(self.antecedent)
+        consequent = cnf.literal(self.consequent)
+        x = cnf.new_var()
+        cnf.add_clause([-x, -antecedent, consequent])
+        cnf.add_clause([x, antecedent])
+        cnf.add_clause([x, -consequent])
+        return x
+
+    def bitwise(self, table):
+        return ~table.column(self.antecedent) | table.column(self.consequent)
+
+    def bdd(self, manager):
+        antecedent = manager.negate(manager.build(self.antecedent))
+        return manager.apply("or", antecedent, manager.build(self.consequent))
+
+    def simplify(self, simplifier):
+        antecedent = simplifier.simplify(self.antecedent)
+        consequent = simplifier.simplify(self.consequent)
+        return simplifier.disjoin([simplifier.negate(antecedent), consequent])
 
 
 class Biconditional(Sentence):
+
+    __slots__ = ("left", "right")
+    tag = "biconditional"
+
     def __init__(self, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
         self.right = right
+        self.freeze()
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional)
+            and self.left == other.left
+            and self.right == other.right)
 
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -216,48 +543,720 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
+
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def children(self):
+        return (self.left, self.right)
+
+    def code(self, compiler):
+        left = compiler.expression(self.left)
+        right = compiler.expression(self.right)
+        return f"({left} == {right})"
+
+    def tseitin(self, cnf):
+        left = cnf.literal(self.left)
+        right = cnf.literal(self.right)
+        x = cnf.new_var()
+        cnf.add_clause([-x, -left, right])
+        cnf.add_clause([-x, left, -right])
+        cnf.add_clause([x, left, right])
+        cnf.add_clause([x, -left, -right])
+        return x
+
+    def bitwise(self, table):
+        return ~(table.column(self.left) ^ table.column(self.right))
+
+    def bdd(self, manager):
+        left = manager.build(self.left)
+        right = manager.build(self.right)
+        return manager.negate(manager.apply("xor", left, right))
+
+    def simplify(self, simplifier):
+        left = simplifier.simplify(self.left)
+        right = simplifier.simplify(self.right)
+        if left == right:
+            return TRUE
+        if left == simplifier.negate(right):
+            return FALSE
+        for a, b in ((left, right), (right, left)):
+            if a == TRUE:
+                return b
+            if a == FALSE:
+                return simplifier.negate(b)
+        return Biconditional(left, right)
+
+
+class Compiler():
+    """
+    Generates the Python source of a function evaluating a sentence over
+    a list of truth values, one per symbol slot. Subsentences that occur
+    more than once are bound to locals so they are only evaluated once.
+    """
+
+    # Deeper expressions are split into locals to stay clear of the
+    # parser's nesting limit.
+    MAX_DEPTH = 32
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.lines = []
+        self.names = {}
+        self.shared = set()
+        self.depth = 0
+
+    def slot(self, name):
+        return f"v{self.slots[name]}"
+
+    def find_shared(self, sentence):
+        """Records every subsentence reached by more than one path."""
+        seen = set()
+        stack = [sentence]
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                if node.children():
+                    self.shared.add(node)
+                continue
+            seen.add(node)
+            stack.extend(node.children())
+
+    def expression(self, sentence):
+        """Returns an expression for sentence, binding it to a local if needed."""
+        if sentence in self.names:
+            return self.names[sentence]
+        self.depth += 1
+        code = sentence.code(self)
+        self.depth -= 1
+        if sentence in self.shared or self.depth >= Compiler.MAX_DEPTH:
+            name = f"t{len(self.lines)}"
+            self.lines.append(f"    {name} = {code}")
+            self.names[sentence] = name
+            return name
+        return code
+
+    def source(self, sentence):
+        self.find_shared(sentence)
+        result = self.expression(sentence)
+        unpack = "".join(f"v{i}, " for i in range(len(self.slots)))
+        header = [
+            "def evaluate(values):",
+            f"    {unpack} = values" if self.slots else "    pass",
+        ]
+        return "\n".join(header + self.lines + [f"    return {result}"])
+
+
+class CompiledSentence():
+    """
+    A sentence compiled into a Python function over symbol slots.
+
+    Call it with a sequence of truth values ordered like `symbols`, or use
+    `evaluate` with a model dict just like Sentence.evaluate.
+    """
+
+    def __init__(self, sentence, symbols=None):
+        Sentence.validate(sentence)
+        if symbols is None:
+            symbols = sorted(sentence.symbol_set())
+        self.sentence = sentence
+        self.symbols = list(symbols)
+        self.slots = {name: i for i, name in enumerate(self.symbols)}
+        missing = sentence.symbol_set() - self.slots.keys()
+        if missing:
+            raise Exception(f"variable {min(missing)} not in symbols")
+        self.source = Compiler(self.slots).source(sentence)
+        namespace = {}
+        exec(compile(self.source, "<sentence>", "exec"), namespace)
+        self.function = namespace["evaluate"]
+
+    def __call__(self, values):
+        return self.function(values)
+
+    def evaluate(self, model):
+        try:
+            return self.function([bool(model[name]) for name in self.symbols])
+        except KeyError as e:
+            raise Exception(f"variable {e.args[0]} not in model")
+
+
+class Constant(Sentence):
+    """
+    The sentences true and false. There are exactly two, TRUE and FALSE,
+    compared by identity; unlike And() and Or() they can never change.
+    """
+
+    __slots__ = ("value",)
+    tag = "constant"
+    shared = False
+
+    def __init__(self, value):
+        self.value = value
+        self._hash = hash((self.tag, value))
+        self._symbols = frozenset()
+
+    def __eq__(self, other):
+        return self is other
+
+    __hash__ = Sentence.__hash__
+
+    def __reduce__(self):
+        # Unpickle as the module's own constant
+        return "TRUE" if self.value else "FALSE"
+
+    def __repr__(self):
+        return "TRUE" if self.value else "FALSE"
 
+    def evaluate(self, model):
+        return self.value
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def evaluate_partial(self, model):
+        return self.value
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+    def formula(self):
+        return "⊤" if self.value else "⊥"
+
+    def code(self, compiler):
+        return repr(self.value)
+
+    def tseitin(self, cnf):
+        return cnf.constant(self.value)
+
+    def bitwise(self, table):
+        return table.ones if self.value else table.zeros
+
+    def bdd(self, manager):
+        return 1 if self.value else 0
+
+
+TRUE = Constant(True)
+FALSE = Constant(False)
+
+
+class Simplifier():
+    """
+    Rewrites sentences into simpler equivalent ones: nested And/Or are
+    flattened, duplicates dropped, constants folded, x with ¬x collapsed,
+    absorbed terms removed (a ∧ (a ∨ b) is a), double negations cancelled
+    and implications turned into disjunctions. Symbols given in `units`
+    are replaced by their values.
+    """
+
+    def __init__(self, units=None):
+        self.units = dict(units or {})
+        self.memo = {}
+
+    def simplify(self, sentence):
+        if sentence not in self.memo:
+            self.memo[sentence] = sentence.simplify(self)
+        return self.memo[sentence]
+
+    def negate(self, sentence):
+        if sentence == TRUE:
+            return FALSE
+        if sentence == FALSE:
+            return TRUE
+        if isinstance(sentence, Not):
+            return sentence.operand
+        return Not(sentence)
+
+    def conjoin(self, sentences):
+        return self.combine(sentences, And, TRUE, FALSE, Or)
+
+    def disjoin(self, sentences):
+        return self.combine(sentences, Or, FALSE, TRUE, And)
+
+    def combine(self, sentences, kind, identity, zero, dual):
+        """
+        Builds the flattened `kind` (And or Or) of already simplified
+        sentences, where identity is dropped and zero absorbs everything.
+        """
+        operands = {}
+        for sentence in sentences:
+            parts = sentence.children() if isinstance(sentence, kind) else (sentence,)
+            for part in parts:
+                if part == zero:
+                    return zero
+                if part != identity:
+                    operands[part] = None
+
+        # x together with ¬x
+        for operand in operands:
+            if isinstance(operand, Not) and operand.operand in operands:
+                return zero
+
+        # Absorption: drop a dual term sharing an operand with this one
+        kept = [operand for operand in operands
+                if not (isinstance(operand, dual)
+                        and any(part in operands for part in operand.children()))]
+
+        if not kept:
+            return identity
+        if len(kept) == 1:
+            return kept[0]
+        return kind(*kept)
+
+
+def simplify(sentence, units=None):
+    """Returns a simpler sentence equivalent to sentence given units."""
+    Sentence.validate(sentence)
+    return Simplifier(units).simplify(sentence)
+
+
+def simplify_knowledge(knowledge):
+    """
+    Simplifies a knowledge base and substitutes every symbol fixed by a
+    top-level unit literal, until no new units appear.
+
+    Returns (simplified, units), where units maps each fixed symbol to its
+    value; knowledge is equivalent to simplified together with the units,
+    and simplified no longer mentions the fixed symbols.
+    """
+    units = {}
+    simplified = simplify(knowledge)
+    while True:
+        found = {}
+        conjuncts = simplified.children() if isinstance(simplified, And) else (simplified,)
+        for conjunct in conjuncts:
+            if isinstance(conjunct, Symbol):
+                found[conjunct.name] = True
+            elif isinstance(conjunct, Not) and isinstance(conjunct.operand, Symbol):
+                found[conjunct.operand.name] = False
+
+        # Each round must fix a new symbol, so this always ends
+        found = {name: value for name, value in found.items() if name not in units}
+        if not found:
+            return simplified, units
+        units.update(found)
+        simplified = simplify(simplified, units)
+
+
+class CNF():
+    """
+    Tseitin encoding of sentences into clauses over integer variables.
+
+    Every symbol gets a variable, and every compound subsentence gets a
+    fresh variable constrained to be equivalent to it, so the clauses grow
+    linearly with the sentence. Clauses go straight into `solver`, a
+    sat.Solver unless another object with new_var and add_clause is given.
+    """
+
+    def __init__(self, solver=None):
+        self.solver = solver if solver is not None else Solver()
+        self.variables = {}
+        self.literals = {}
+        self.true = None
+
+    def new_var(self):
+        return self.solver.new_var()
+
+    def add_clause(self, literals):
+        self.solver.add_clause(literals)
+
+    def variable(self, name):
+        """Returns the variable for a symbol name, creating it if needed."""
+        if name not in self.variables:
+            self.variables[name] = self.new_var()
+        return self.variables[name]
+
+    def constant(self, value):
+        """Returns a literal that is always equal to value."""
+        if self.true is None:
+            self.true = self.new_var()
+            self.add_clause([self.true])
+        return self.true if value else -self.true
+
+    def literal(self, sentence):
+        """Returns the literal equivalent to sentence, encoding it once."""
+        if sentence not in self.literals:
+            self.literals[sentence] = sentence.tseitin(self)
+        return self.literals[sentence]
+
+    def add(self, sentence, activation=None):
+        """
+        Adds clauses asserting that sentence is true. If an activation
+        literal is given, the clauses only apply while it is true.
+        """
+        Sentence.validate(sentence)
+        guard = [] if activation is None else [-activation]
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct, activation)
+        elif isinstance(sentence, Or):
+            self.add_clause([self.literal(disjunct)
+                             for disjunct in sentence.disjuncts] + guard)
+        else:
+            self.add_clause([self.literal(sentence)] + guard)
+
+    def model(self):
+        """Returns the solver's last satisfying model as {symbol: value}."""
+        return {name: bool(self.solver.model[var])
+                for name, var in self.variables.items()}
+
+
+class KnowledgeBase():
+    """
+    A knowledge base that keeps one SAT solver, and everything it has
+    learned, alive across queries.
+
+    tell adds sentences, push opens a scope and pop retracts everything
+    told since the matching push. Sentences told inside a scope are guarded
+    by that scope's activation variable, which ask assumes true; pop makes
+    it permanently false, switching those clauses off for good.
+    """
+
+    def __init__(self, *sentences):
+        self.cnf = CNF()
+        self.scopes = []
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def tell(self, sentence):
+        """Adds sentence to the knowledge base in the innermost scope."""
+        self.cnf.add(sentence, self.scopes[-1] if self.scopes else None)
+
+    def push(self):
+        """Opens a scope of assumptions."""
+        self.scopes.append(self.cnf.new_var())
+
+    def pop(self):
+        """Retracts every sentence told since the matching push."""
+        if not self.scopes:
+            raise Exception("no scope to pop")
+        self.cnf.add_clause([-self.scopes.pop()])
+
+    def consistent(self):
+        """Checks that some model satisfies everything currently told."""
+        return self.cnf.solver.solve(self.scopes)
+
+    def ask(self, query):
+        """Checks if the knowledge base currently entails query."""
+        Sentence.validate(query)
+        negation = -self.cnf.literal(query)
+        return not self.cnf.solver.solve(self.scopes + [negation])
+
+
+class TruthTable():
+    """
+    Evaluates sentences over every assignment of a list of symbols at once.
+
+    Each symbol is a column of 2^n truth values packed into uint64 words,
+    and each connective is a bitwise NumPy operation over whole columns.
+    The first `chunk_bits` symbols vary within a chunk; every combination
+    of the rest is a separate chunk in which those symbols are constant,
+    so memory stays bounded however many rows there are. Needs NumPy.
+    """
+
+    # Bit patterns of the first six symbols within one 64-row word.
+    PATTERNS = [
+        0xAAAAAAAAAAAAAAAA, 0xCCCCCCCCCCCCCCCC, 0xF0F0F0F0F0F0F0F0,
+        0xFF00FF00FF00FF00, 0xFFFF0000FFFF0000, 0xFFFFFFFF00000000,
+    ]
+
+    def __init__(self, symbols, chunk_bits=20):
+        import numpy as np
+        self.np = np
+        self.symbols = list(symbols)
+        self.low = min(len(self.symbols), max(chunk_bits, 6))
+        words = max(1, 2 ** self.low // 64)
+
+        self.ones = np.full(words, np.iinfo(np.uint64).max, dtype=np.uint64)
+        self.zeros = np.zeros(words, dtype=np.uint64)
+        if self.low < 6:
+            self.valid = np.array([(1 << 2 ** self.low) - 1], dtype=np.uint64)
+        else:
+            self.valid = self.ones
+
+        index = np.arange(words, dtype=np.uint64)
+        self.low_columns = {}
+        for i, name in enumerate(self.symbols[:self.low]):
+            if i < 6:
+                column = np.full(words, TruthTable.PATTERNS[i], dtype=np.uint64)
+            else:
+                bit = (index >> np.uint64(i - 6)) & np.uint64(1)
+                column = np.where(bit == 1, self.ones, self.zeros)
+            self.low_columns[name] = column
+        self.columns = None
+        self.memo = None
+        self.rows = 0
+
+    def chunks(self):
+        """Sets up each chunk of rows in turn, yielding its index."""
+        high = self.symbols[self.low:]
+        for chunk in range(2 ** len(high)):
+            self.columns = dict(self.low_columns)
+            for j, name in enumerate(high):
+                self.columns[name] = self.ones if (chunk >> j) & 1 else self.zeros
+            self.memo = {}
+            yield chunk
+
+    def column(self, sentence):
+        """Returns the truth column of sentence in the current chunk."""
+        if sentence not in self.memo:
+            self.memo[sentence] = sentence.bitwise(self)
+        return self.memo[sentence]
+
+    def entails(self, knowledge, query):
+        """Checks that query holds in every row where knowledge holds."""
+        self.rows = 0
+        for _ in self.chunks():
+            self.rows += 2 ** self.low
+            counter = self.column(knowledge) & ~self.column(query) & self.valid
+            if self.np.any(counter):
+                return False
+        return True
+
+
+# Per-process state of parallel model checking workers.
+_stop = None
+_compiled = {}
+
+
+def _init_worker(stop):
+    global _stop
+    _stop = stop
+
+
+def check_cube(knowledge, query, symbols, prefix):
+    """
+    Checks entailment over the models in which the first symbols take the
+    values in prefix. Returns None if told to stop because another cube
+    already found a counter-model.
+    """
+    key = (knowledge, query, tuple(symbols))
+    if key not in _compiled:
+        _compiled.clear()
+        _compiled[key] = (knowledge.compile(symbols).function,
+                          query.compile(symbols).function)
+    knowledge_function, query_function = _compiled[key]
+
+    prefix = tuple(prefix)
+    rest = itertools.product((True, False), repeat=len(symbols) - len(prefix))
+    for n, values in enumerate(rest):
+        if n % 4096 == 0 and _stop is not None and _stop.is_set():
+            return None
+        values = prefix + values
+        if knowledge_function(values) and not query_function(values):
+            return False
+    return True
+
+
+def parallel_model_check(knowledge, query, workers=None, cube_bits=None):
+    """
+    Checks if knowledge base entails query, splitting the models into
+    2^cube_bits cubes by fixing the first symbols and checking the cubes
+    in a pool of worker processes. As soon as one cube finds a
+    counter-model the rest are cancelled or told to stop.
+    """
+    symbols = sorted(knowledge.symbol_set() | query.symbol_set())
+    workers = workers or os.cpu_count() or 1
+    if cube_bits is None:
+        cube_bits = (4 * workers - 1).bit_length()
+    cube_bits = min(cube_bits, len(symbols))
+
+    stop = multiprocessing.Event()
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(stop,)
+    ) as pool:
+        futures = [pool.submit(check_cube, knowledge, query, symbols, prefix)
+                   for prefix in itertools.product((True, False), repeat=cube_bits)]
+        for future in concurrent.futures.as_completed(futures):
+            if future.result() is False:
+                stop.set()
+                for pending in futures:
+                    pending.cancel()
+                return False
+    return True
+
+
+def compiled_model_check(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query by evaluating compiled forms of
+    both in every model of their symbols.
+    """
+
+    def check_all(index):
+        """Checks if knowledge base entails query, given values for the symbols before index."""
+        nonlocal nodes
 
         # If model has an assignment for each symbol
-        if not symbols:
+        if index == len(symbols):
+            nodes += 1
 
             # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
+            if knowledge_function(values):
+                return query_function(values)
             return True
         else:
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
+            # Ensure entailment holds with the next symbol true and false
+            values[index] = True
+            if not check_all(index + 1):
+                return False
+            values[index] = False
+            return check_all(index + 1)
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+    # Get all symbols in both knowledge and query
+    symbols = sorted(knowledge.symbol_set() | query.symbol_set())
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
+    # Compile both sentences over the same symbol slots
+    knowledge_function = knowledge.compile(symbols).function
+    query_function = query.compile(symbols).function
+    values = [False] * len(symbols)
+    nodes = 0
+
+    # Check that knowledge entails query
+    entailed = check_all(0)
+    if stats is not None:
+        stats["nodes"] = nodes
+    return entailed
+
+
+def model_check(knowledge, query, method="enumerate", workers=None,
+                simplify=False, stats=None):
+    """
+    Checks if knowledge base entails query.
+
+    If simplify is True, both are simplified first and symbols fixed by
+    unit clauses of the knowledge base are substituted away.
+
+    method "enumerate" searches the models of the symbols, pruning each
+    branch as soon as its partial model settles the answer; "compiled"
+    evaluates compiled sentences in every model; "parallel" does the same
+    across `workers` processes; "truthtable" checks every model at once
+    with NumPy; "sat" asks the SAT solver whether knowledge and not query
+    is unsatisfiable; "bdd" compiles both into a binary decision diagram.
+
+    If stats is a dict, stats["nodes"] is set to the work the method did:
+    partial models visited, complete models or truth table rows checked,
+    BDD nodes created or SAT solver decisions. "parallel" leaves it unset.
+    """
+    if stats is not None:
+        stats.pop("nodes", None)
+    if simplify:
+        knowledge, units = simplify_knowledge(knowledge)
+        query = Simplifier(units).simplify(query)
+        if knowledge == FALSE or query == TRUE:
+            if stats is not None:
+                stats["nodes"] = 0
+            return True
+
+    if method == "compiled":
+        return compiled_model_check(knowledge, query, stats)
+    elif method == "parallel":
+        return parallel_model_check(knowledge, query, workers)
+    elif method == "truthtable":
+        symbols = sorted(knowledge.symbol_set() | query.symbol_set())
+        table = TruthTable(symbols)
+        entailed = table.entails(knowledge, query)
+        if stats is not None:
+            stats["nodes"] = table.rows
+        return entailed
+    elif method == "bdd":
+        manager = BDD(force_order(knowledge, query))
+        entailed = manager.entails(manager.build(knowledge), query)
+        if stats is not None:
+            stats["nodes"] = len(manager)
+        return entailed
+    elif method == "sat":
+        cnf = CNF()
+        cnf.add(knowledge)
+        cnf.add(Not(query))
+        entailed = not cnf.solver.solve()
+        if stats is not None:
+            stats["nodes"] = cnf.solver.decisions
+        return entailed
+    elif method != "enumerate":
+        raise ValueError(f"unknown model checking method {method}")
+
+    def check_all(index):
+        """Checks if knowledge base entails query, given the partial model."""
+        nonlocal nodes
+        nodes += 1
+
+        # If knowledge base is already false, or query already true,
+        # every completion of the model agrees
+        known = knowledge.evaluate_partial(model)
+        if known is False:
+            return True
+        answer = query.evaluate_partial(model)
+        if answer is True:
+            return True
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+        # If knowledge base is true and query false, every completion
+        # is a counter-model
+        if known is True and answer is False:
+            return False
+
+        # Ensure entailment holds with the next symbol true and false,
+        # updating the model in place and undoing the change after
+        p = symbols[index]
+        model[p] = True
+        entailed = check_all(index + 1)
+        if entailed:
+            model[p] = False
+            entailed = check_all(index + 1)
+        del model[p]
+        return entailed
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = occurrence_order(knowledge, query)
+    model = dict()
+    nodes = 0
 
     # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    entailed = check_all(0)
+    if stats is not None:
+        stats["nodes"] = nodes
+    return entailed
+
+
+def model_check_many(knowledge, queries, models=False):
+    """
+    Checks which of several queries knowledge base entails, enumerating
+    the models of the knowledge base once for all of them.
+
+    Returns a list with one boolean per query. If models is True, returns
+    (results, satisfying) where satisfying lists every model of the
+    knowledge base as a dict.
+    """
+    queries = list(queries)
+    symbols = sorted(knowledge.symbol_set().union(
+        *[query.symbol_set() for query in queries]
+    ))
+    knowledge_function = knowledge.compile(symbols).function
+    query_functions = [query.compile(symbols).function for query in queries]
+
+    results = [True] * len(queries)
+    remaining = list(range(len(queries)))
+    satisfying = []
+    for values in itertools.product((True, False), repeat=len(symbols)):
+        if not knowledge_function(values):
+            continue
+        if models:
+            satisfying.append(dict(zip(symbols, values)))
+
+        # A query false in any model of the knowledge base is not entailed
+        still_open = []
+        for i in remaining:
+            if query_functions[i](values):
+                still_open.append(i)
+            else:
+                results[i] = False
+        remaining = still_open
+        if not remaining and not models:
+            break
+
+    if models:
+        return results, satisfying
+    return results
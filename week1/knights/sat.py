@@ -0,0 +1,286 @@
+"""
+A small CDCL SAT solver.
+
+Variables are positive integers and literals are non-zero integers, with
+-v standing for "not v", as in DIMACS. The solver uses two watched
+literals per clause for unit propagation, learns first-UIP clauses on
+conflicts with non-chronological backjumping, picks branches by VSIDS
+activity with phase saving, and restarts on the Luby sequence.
+"""
+
+import heapq
+
+
+def luby(i):
+    """Returns the i-th element (from 1) of the Luby restart sequence."""
+    size, power = 1, 0
+    while size < i + 1:
+        power += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        power -= 1
+        i = i % size
+    return 2 ** power
+
+
+class Solver():
+    """
+    Decides satisfiability of a growing set of clauses.
+
+    Clauses may be added between calls to solve; everything learned so
+    far stays valid because clauses are only ever added.
+    """
+
+    RESTART_BASE = 100
+    ACTIVITY_DECAY = 0.95
+
+    def __init__(self):
+        self.num_vars = 0
+        self.watches = {}       # literal -> clauses watching it
+        self.assigns = [None]   # variable -> True, False or None
+        self.levels = [0]       # variable -> decision level of assignment
+        self.reasons = [None]   # variable -> clause that implied it
+        self.activity = [0.0]
+        self.phase = [False]
+        self.heap = []          # (-activity, variable), may hold stale entries
+        self.activity_inc = 1.0
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.ok = True
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    def new_var(self):
+        """Creates a fresh variable and returns it."""
+        self.num_vars += 1
+        var = self.num_vars
+        self.assigns.append(None)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        self.watches[var] = []
+        self.watches[-var] = []
+        heapq.heappush(self.heap, (0.0, var))
+        return var
+
+    def value(self, lit):
+        """Returns the truth value of a literal, or None if unassigned."""
+        value = self.assigns[abs(lit)]
+        if value is None or lit > 0:
+            return value
+        return not value
+
+    def add_clause(self, literals):
+        """
+        Adds a clause, given as an iterable of literals. Returns False if
+        the clauses are now known to be unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        clause = []
+        for lit in literals:
+            while abs(lit) > self.num_vars:
+                self.new_var()
+            value = self.value(lit)
+            if value is True or -lit in clause:
+                return True
+            if value is None and lit not in clause:
+                clause.append(lit)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.watch(clause)
+        return self.ok
+
+    def watch(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def assign(self, lit, reason):
+        var = abs(lit)
+        self.assigns[var] = lit > 0
+        self.levels[var] = len(self.trail_lim)
+        self.reasons[var] = reason
+        self.trail.append(lit)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses. Returns a conflicting
+        clause, or None if propagation finished without conflict.
+        """
+        value = self.value
+        while self.qhead < len(self.trail):
+            false_lit = -self.trail[self.qhead]
+            self.qhead += 1
+            self.propagations += 1
+            watchers = self.watches[false_lit]
+            kept = self.watches[false_lit] = []
+            for n, clause in enumerate(watchers):
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+                first = clause[0]
+                if value(first) is True:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    if value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if value(first) is False:
+                        kept.extend(watchers[n + 1:])
+                        self.qhead = len(self.trail)
+                        return clause
+                    self.assign(first, clause)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the first-UIP clause learned from a conflict, with the
+        asserting literal first, and the level to backjump to.
+        """
+        level = len(self.trail_lim)
+        learnt = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        lit = None
+        while True:
+            for q in (clause if lit is None else clause[1:]):
+                var = abs(q)
+                if var not in seen and self.levels[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.levels[var] == level:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            clause = self.reasons[abs(lit)]
+            pending -= 1
+            if pending == 0:
+                break
+        learnt[0] = -lit
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # Watch the literal from the highest remaining level second.
+        deepest = max(range(1, len(learnt)),
+                      key=lambda k: self.levels[abs(learnt[k])])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def bump(self, var):
+        self.activity[var] += self.activity_inc
+        if self.activity[var] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.activity_inc *= 1e-100
+            self.heap = [(-self.activity[v], v) for v in range(1, self.num_vars + 1)
+                         if self.assigns[v] is None]
+            heapq.heapify(self.heap)
+
+    def backtrack(self, level):
+        """Undoes every assignment above the given decision level."""
+        if len(self.trail_lim) <= level:
+            return
+        for lit in self.trail[self.trail_lim[level]:]:
+            var = abs(lit)
+            self.phase[var] = lit > 0
+            self.assigns[var] = None
+            self.reasons[var] = None
+            heapq.heappush(self.heap, (-self.activity[var], var))
+        del self.trail[self.trail_lim[level]:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def pick_branch(self):
+        """Returns the unassigned variable with the highest activity, or None."""
+        while self.heap:
+            _, var = heapq.heappop(self.heap)
+            if self.assigns[var] is None:
+                return var
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses are satisfiable, leaving a satisfying
+        assignment in self.model (a list indexed by variable), else False.
+
+        assumptions is a sequence of literals to hold for this call only.
+        They are taken as the first decisions, so clauses learned while
+        solving stay valid for later calls without them.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        assumptions = list(assumptions)
+        for lit in assumptions:
+            while abs(lit) > self.num_vars:
+                self.new_var()
+        self.backtrack(0)
+        if self.propagate() is not None:
+            self.ok = False
+            return False
+
+        restarts = 0
+        budget = luby(restarts) * Solver.RESTART_BASE
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                budget -= 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.watch(learnt)
+                    self.assign(learnt[0], learnt)
+                self.activity_inc /= Solver.ACTIVITY_DECAY
+                continue
+
+            if budget <= 0:
+                restarts += 1
+                budget = luby(restarts) * Solver.RESTART_BASE
+                self.backtrack(0)
+                continue
+
+            level = len(self.trail_lim)
+            if level < len(assumptions):
+                lit = assumptions[level]
+                value = self.value(lit)
+                if value is False:
+                    # The clauses imply the negation of an assumption.
+                    self.backtrack(0)
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if value is None:
+                    self.assign(lit, None)
+                continue
+
+            var = self.pick_branch()
+            if var is None:
+                self.model = list(self.assigns)
+                self.backtrack(0)
+                return True
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.assign(var if self.phase[var] else -var, None)
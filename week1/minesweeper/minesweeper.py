@@ -1,6 +1,9 @@
-import itertools
+import collections
+import math
 import random
 
+import numpy as np
+
 """
 minesweeper.py creates an AI to assist human minesweeper play.
 The AI will automatically pick known safe moves, or pick random
@@ -19,31 +22,52 @@ class Minesweeper():
     Minesweeper game representation
     """
 
-    def __init__(self, height=8, width=8, mines=8):
+    def __init__(self, height=8, width=8, mines=8, seed=None, first_click=None):
+        """
+        Places mines by sampling cells without replacement from a NumPy
+        generator seeded with seed. If first_click is a cell, no mine is
+        put there, nor next to it while there is room elsewhere.
+        """
 
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
+        # Cells kept free of mines
+        protected = set()
+        if first_click is not None:
+            i, j = first_click
+            protected = {(i, j)}
+            around = {(i + di, j + dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                      if 0 <= i + di < height and 0 <= j + dj < width}
+            if height * width - len(around) >= mines:
+                protected = around
+        # Cells that may hold a mine, as flat indices
+        candidates = np.ones(height * width, dtype=bool)
+        for i, j in protected:
+            candidates[i * width + j] = False
+        candidates = np.flatnonzero(candidates)
+        if mines > len(candidates):
+            raise ValueError(f"cannot place {mines} mines in {len(candidates)} cells")
 
         # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
-
-        # At first, player has found no mines
+        rng = np.random.default_rng(seed)
+        self.board = np.zeros((height, width), dtype=bool)
+        self.board.flat[rng.choice(candidates, size=mines, replace=False)] = True
+        self.mines = set(zip(*map(np.ndarray.tolist, np.nonzero(self.board))))
+
+        # Count each cell's neighbouring mines once, as the sum of the
+        # eight shifted copies of the zero-padded board
+        padded = np.pad(self.board.astype(np.uint8), 1)
+        self.counts = np.zeros((height, width), dtype=np.uint8)
+        for di in (0, 1, 2):
+            for dj in (0, 1, 2):
+                if (di, dj) != (1, 1):
+                    self.counts += padded[di:di + height, dj:dj + width]
+
+        # At first, player has found no mines and revealed no cells
         self.mines_found = set()
+        self.revealed = set()
 
     def print(self):
         """
@@ -62,7 +86,7 @@ class Minesweeper():
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i, j])
 
     def nearby_mines(self, cell):
         """
@@ -70,24 +94,34 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
+        i, j = cell
+        return int(self.counts[i, j])
 
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+    def reveal(self, cell):
+        """
+        Reveals a cell that is not a mine. If it has no nearby mines, so
+        does every neighbour, and the reveal floods outward through the
+        connected region of such cells and the numbered cells bordering
+        it. Returns a dict from each newly revealed cell to its number
+        of nearby mines; cells revealed before are left out.
+        """
+        if self.is_mine(cell):
+            raise ValueError(f"cell {cell} is a mine")
+        revealed = {}
+        stack = [cell]
+        while stack:
+            i, j = stack.pop()
+            if (i, j) in revealed or (i, j) in self.revealed:
+                continue
+            count = self.counts.item(i, j)
+            revealed[(i, j)] = count
+            if count == 0:
+                for di in (-1, 0, 1):
+                    for dj in (-1, 0, 1):
+                        if 0 <= i + di < self.height and 0 <= j + dj < self.width:
+                            stack.append((i + di, j + dj))
+        self.revealed.update(revealed)
+        return revealed
 
     def won(self):
         """
@@ -101,24 +135,117 @@ class Sentence():
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+
+    Cells are stored as bits of an int: cell (i, j) is bit
+    i * width + j, so width must be the width of the board. The bits
+    are shifted down to start at the lowest cell, kept in offset, so
+    the int stays small on large boards. Subset tests, differences and
+    membership are then a few integer operations, and sentences can be
+    hashed, as long as they are not changed while in a set or dict.
     """
 
-    def __init__(self, cells, count):
-        self.cells = set(cells)
+    def __init__(self, cells, count, width=8):
+        self.width = width
         self.count = count
+        bits = []
+        for i, j in cells:
+            if not 0 <= j < width:
+                raise ValueError(f"cell {(i, j)} is outside a board of width {width}")
+            bits.append(i * width + j)
+        self.offset = min(bits, default=0)
+        self.mask = 0
+        for bit in bits:
+            self.mask |= 1 << (bit - self.offset)
+        self._cells = None
+        self._hash = hash((self.offset, self.mask, count))
+
+    @classmethod
+    def from_mask(cls, offset, mask, count, width):
+        """
+        Returns the sentence whose cells are the bits of mask shifted up by offset.
+        """
+        sentence = cls.__new__(cls)
+        sentence.width = width
+        sentence.count = count
+        sentence.offset = sentence.mask = 0
+        sentence._cells = None
+        if mask:
+            low = (mask & -mask).bit_length() - 1
+            sentence.offset = offset + low
+            sentence.mask = mask >> low
+        sentence._hash = hash((sentence.offset, sentence.mask, count))
+        return sentence
+
+    @property
+    def cells(self):
+        """The cells as a frozenset of (i, j), decoded once and cached."""
+        if self._cells is None:
+            cells = []
+            mask = self.mask
+            while mask:
+                low = mask & -mask
+                cells.append(divmod(self.offset + low.bit_length() - 1, self.width))
+                mask ^= low
+            self._cells = frozenset(cells)
+        return self._cells
+
+    def __len__(self):
+        return bin(self.mask).count("1")
+
+    def __contains__(self, cell):
+        i, j = cell
+        bit = i * self.width + j - self.offset
+        return 0 <= j < self.width and bit >= 0 and (self.mask >> bit) & 1 == 1
 
     def __eq__(self, other):
-        return self.cells == other.cells and self.count == other.count
+        return (self.offset, self.mask, self.count, self.width) == (
+            other.offset, other.mask, other.count, other.width
+        )
+
+    def __hash__(self):
+        return self._hash
 
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
+    def aligned(self, other):
+        """
+        Returns the cells of other as a mask with the same offset as self,
+        leaving out any below it.
+        """
+        shift = other.offset - self.offset
+        return other.mask << shift if shift >= 0 else other.mask >> -shift
+
+    def issubset(self, other):
+        """
+        Checks if every cell of self is a cell of other.
+        """
+        if self.offset < other.offset:
+            return self.mask == 0
+        return other.aligned(self) & ~other.mask == 0
+
+    def difference(self, other):
+        """
+        Returns the sentence for the cells of self that are not in other,
+        which holds when other is a sentence about a subset of them.
+        """
+        return Sentence.from_mask(self.offset, self.mask & ~self.aligned(other),
+                                  self.count - other.count, self.width)
+
+    def without(self, cell, mine):
+        """
+        Returns the sentence with cell removed, given whether it is a mine.
+        """
+        bit = 1 << (cell[0] * self.width + cell[1] - self.offset)
+        return Sentence.from_mask(self.offset, self.mask & ~bit,
+                                  self.count - mine, self.width)
+
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
         @ Author: Darin Kishore
         """
-        if len(self.cells) == self.count:
+        if len(self) == self.count:
             return self.cells
         else:
             return set()
@@ -139,9 +266,9 @@ class Sentence():
         a cell is known to be a mine.
         @ Author: Darin Kishore
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
-            self.count -= 1
+        if cell in self:
+            marked = self.without(cell, True)
+            self.__dict__.update(marked.__dict__)
 
     def mark_safe(self, cell):
         """
@@ -149,8 +276,105 @@ class Sentence():
         a cell is known to be safe.
         @ Author: Darin Kishore
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
+        if cell in self:
+            marked = self.without(cell, False)
+            self.__dict__.update(marked.__dict__)
+
+
+def add_polynomials(a, b):
+    """
+    Returns the sum of two polynomials given as coefficient lists.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    return [x + (b[k] if k < len(b) else 0) for k, x in enumerate(a)]
+
+
+def multiply_polynomials(a, b):
+    """
+    Returns the product of two polynomials given as coefficient lists.
+    """
+    product = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                product[i + j] += x * y
+    return product
+
+
+def count_solutions(cells, sentences):
+    """
+    Counts the ways to place mines in cells that satisfy every sentence,
+    where each sentence only mentions cells in the list.
+
+    Returns (totals, mines): totals[k] is the number of solutions with k
+    mines, and mines[cell][k] the number of those in which cell is a
+    mine. Cells are assigned in order, and solutions of the remaining
+    cells are memoised on how many mines each sentence still needs, so
+    cells that are far apart in the order do not multiply the work.
+    """
+    position = {cell: i for i, cell in enumerate(cells)}
+    needed = tuple(sentence.count for sentence in sentences)
+    touches = [[] for _ in cells]
+    last = [0] * len(sentences)
+    for n, sentence in enumerate(sentences):
+        for cell in sentence.cells:
+            touches[position[cell]].append(n)
+            last[n] = max(last[n], position[cell])
+    left = [[0] * len(sentences) for _ in range(len(cells) + 1)]
+    for i in range(len(cells) - 1, -1, -1):
+        left[i] = list(left[i + 1])
+        for n in touches[i]:
+            left[i][n] += 1
+
+    def assign(i, state, mine):
+        """Returns the state after cell i is assigned, or None if impossible."""
+        state = list(state)
+        for n in touches[i]:
+            state[n] -= mine
+            if not 0 <= state[n] <= left[i + 1][n]:
+                return None
+        return tuple(state)
+
+    memo = {}
+
+    def completions(i, state):
+        """Returns solutions of cells i onwards by number of mines."""
+        if i == len(cells):
+            return [1]
+        key = (i, state)
+        if key not in memo:
+            ways = [0]
+            for mine in (0, 1):
+                after = assign(i, state, mine)
+                if after is not None:
+                    ways = add_polynomials(ways, [0] * mine + completions(i + 1, after))
+            memo[key] = ways
+        return memo[key]
+
+    totals = completions(0, needed)
+
+    # Walk forward through the reachable states, counting the solutions
+    # through each that put a mine in each cell.
+    mines = {}
+    layer = {needed: [1]}
+    for i, cell in enumerate(cells):
+        next_layer = {}
+        marginal = [0]
+        for state, before in layer.items():
+            for mine in (0, 1):
+                after = assign(i, state, mine)
+                if after is None or not any(completions(i + 1, after)):
+                    continue
+                through = [0] * mine + before
+                next_layer[after] = add_polynomials(next_layer.get(after, [0]), through)
+                if mine:
+                    marginal = add_polynomials(
+                        marginal, multiply_polynomials(through, completions(i + 1, after))
+                    )
+        mines[cell] = marginal
+        layer = next_layer
+    return totals, mines
 
 
 class MinesweeperAI():
@@ -158,12 +382,15 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None):
 
         # Set initial height and width
         self.height = height
         self.width = width
 
+        # Total number of mines on the board, if known
+        self.total_mines = mines
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -171,28 +398,65 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Safe cells in the order they were found, some possibly since
+        # clicked on, for make_safe_move
+        self.safe_queue = collections.deque()
+
+        # Cells neither clicked on nor known to be mines, as a list to
+        # sample from and each cell's position in it, so a cell can be
+        # removed by moving the last one into its place
+        self.unrevealed = [(i, j) for i in range(height) for j in range(width)]
+        self.unrevealed_index = {cell: n for n, cell in enumerate(self.unrevealed)}
+
+        # Number of cells not known to be safe or mines
+        self.unknown = height * width
+
+        # Sentences about the game known to be true. Stored sentences
+        # are replaced rather than changed, so they can be hashed.
+        self.knowledge = set()
+
+        # For each cell, the sentences that mention it
+        self.index = {}
+
+        # Sentences not yet checked for conclusions
+        self.pending = set()
 
     def mark_mine(self, cell):
         """
-        Marks a cell as a mine, and updates all knowledge
-        to mark that cell as a mine as well.
+        Marks a cell as a mine, and updates the sentences
+        that mention it to mark that cell as a mine as well.
         """
+        if cell not in self.mines and cell not in self.safes:
+            self.unknown -= 1
         self.mines.add(cell)
-        if self.knowledge:
-            for sentence in self.knowledge:
-                sentence.mark_mine(cell)
+        self.discard_unrevealed(cell)
+        for sentence in self.index.pop(cell, ()):
+            self.replace_sentence(sentence, sentence.without(cell, True))
 
     def mark_safe(self, cell):
         """
-        Marks a cell as safe, and updates all knowledge
-        to mark that cell as safe as well.
+        Marks a cell as safe, and updates the sentences
+        that mention it to mark that cell as safe as well.
         """
+        if cell not in self.safes and cell not in self.moves_made:
+            self.safe_queue.append(cell)
+        if cell not in self.safes and cell not in self.mines:
+            self.unknown -= 1
         self.safes.add(cell)
-        if self.knowledge:
-            for sentence in self.knowledge:
-                sentence.mark_safe(cell)
+        for sentence in self.index.pop(cell, ()):
+            self.replace_sentence(sentence, sentence.without(cell, False))
+
+    def discard_unrevealed(self, cell):
+        """
+        Removes a cell from the unrevealed cells, if it is there.
+        """
+        n = self.unrevealed_index.pop(cell, None)
+        if n is None:
+            return
+        last = self.unrevealed.pop()
+        if n < len(self.unrevealed):
+            self.unrevealed[n] = last
+            self.unrevealed_index[last] = n
 
     def is_safe(self, cell):
         return cell in self.safes
@@ -200,6 +464,74 @@ class MinesweeperAI():
     def is_mine(self, cell):
         return cell in self.mines
 
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base and the cell index,
+        queueing it to be checked for conclusions. Empty sentences
+        and sentences already known are skipped.
+        """
+        if not sentence.mask or sentence in self.knowledge:
+            return
+        self.knowledge.add(sentence)
+        for cell in sentence.cells:
+            self.index.setdefault(cell, set()).add(sentence)
+        self.pending.add(sentence)
+
+    def remove_sentence(self, sentence):
+        """
+        Removes a sentence from the knowledge base and the cell index.
+        """
+        self.knowledge.discard(sentence)
+        self.pending.discard(sentence)
+        for cell in sentence.cells:
+            if cell in self.index:
+                self.index[cell].discard(sentence)
+
+    def replace_sentence(self, old, new):
+        self.remove_sentence(old)
+        self.add_sentence(new)
+
+    def infer(self):
+        """
+        Checks every pending sentence for conclusions: cells it settles
+        are marked as mines or safes, and it is compared with the other
+        sentences that share a cell with it. Marking a cell or shrinking
+        a sentence queues the sentences affected, so this repeats until
+        nothing changes.
+        """
+        while self.pending:
+            sentence = self.pending.pop()
+            if sentence.known_mines():
+                for cell in sentence.known_mines():
+                    self.mark_mine(cell)
+            elif sentence.known_safes():
+                for cell in sentence.known_safes():
+                    self.mark_safe(cell)
+            else:
+                self.subtract_subsets(sentence)
+
+    def subtract_subsets(self, sentence):
+        """
+        Compares sentence with each sentence sharing a cell with it.
+        Whenever one sentence's cells are a subset of the other's, the
+        larger one is replaced by the difference: if A = a and A is
+        inside B = b, then B - A = b - a.
+        """
+        others = set()
+        for cell in sentence.cells:
+            others |= self.index[cell]
+        others.discard(sentence)
+
+        for other in others:
+            if other not in self.knowledge:
+                continue
+            if sentence.issubset(other):
+                self.replace_sentence(other, other.difference(sentence))
+            elif other.issubset(sentence):
+                # the difference is queued to be compared again
+                self.replace_sentence(sentence, sentence.difference(other))
+                return
+
     def add_knowledge(self, cell, count):
         """
         Called when the Minesweeper board tells us, for a given
@@ -210,54 +542,51 @@ class MinesweeperAI():
             2) mark the cell as safe
             3) add a new sentence to the AI's knowledge base
                based on the value of `cell` and `count`
-            3.5) update and refactor values of sentences (see: step 5)
             4) mark any additional cells as safe or as mines
                if it can be concluded based on the AI's knowledge base
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
+
+        Steps 4 and 5 run together in infer(), which only looks at
+        sentences sharing cells with something that changed.
         @ Author: Darin Kishore
         """
-        # 1) Mark the cell as a move made.
-        self.moves_made.add(cell)
-
-        # 2) mark cell safe
-        self.mark_safe(cell)
-
-        # 3) Add new sentence based on value of cell and count.
-        neighbors = set()
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                temp_cell = (i, j)
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if not (self.is_safe(temp_cell) or self.is_mine(temp_cell)):
-                        neighbors.add(temp_cell)
-                    if self.is_mine(temp_cell):
-                        count -= 1
-        neighbors.discard(cell)
-        sent = Sentence(neighbors, count)
-        self.knowledge.append(sent)
-
-        # 4) mark safes/mines
-        for sentence in self.knowledge:
-            if sentence.known_mines():  # mark mines
-                for mine in sentence.known_mines():
-                    self.mines.add(mine)
-            elif sentence.known_safes():  # mark safes
-                for safe in sentence.known_safes():
-                    self.safes.add(safe)
-
-            for mine in self.mines:
-                if mine in sentence.cells:
-                    sentence.mark_mine(mine)
-            for safe in self.safes:
-                if safe in sentence.cells:
-                    sentence.mark_safe(safe)
-
-            if sentence.count <= 0 and len(sentence.cells) == 0:
-                self.knowledge.remove(sentence)
-
-        # 5) after change to knowledge, see if any new inferences can be made
-        self.trim_the_fat()
+        self.add_knowledge_many([(cell, count)])
+
+    def add_knowledge_many(self, cells_with_counts):
+        """
+        Does what add_knowledge does for several revealed cells at once,
+        given as (cell, count) pairs or a dict from cell to count, such
+        as the result of Minesweeper.reveal. Every cell is marked safe
+        before any sentence is made, and inference runs once at the end.
+        """
+        if isinstance(cells_with_counts, dict):
+            cells_with_counts = cells_with_counts.items()
+        cells_with_counts = list(cells_with_counts)
+
+        # 1) and 2) Mark the cells as moves made, and safe.
+        for cell, _ in cells_with_counts:
+            self.moves_made.add(cell)
+            self.discard_unrevealed(cell)
+            self.mark_safe(cell)
+
+        # 3) Add new sentences based on the value of each cell and count.
+        for cell, count in cells_with_counts:
+            neighbors = set()
+            for i in range(cell[0] - 1, cell[0] + 2):
+                for j in range(cell[1] - 1, cell[1] + 2):
+                    temp_cell = (i, j)
+                    if 0 <= i < self.height and 0 <= j < self.width:
+                        if not (self.is_safe(temp_cell) or self.is_mine(temp_cell)):
+                            neighbors.add(temp_cell)
+                        if self.is_mine(temp_cell):
+                            count -= 1
+            neighbors.discard(cell)
+            self.add_sentence(Sentence(neighbors, count, self.width))
+
+        # 4) and 5) mark safes/mines and subtract subset sentences,
+        # following each change through the sentences it affects
+        self.infer()
 
     def make_safe_move(self):
         """
@@ -266,9 +595,11 @@ class MinesweeperAI():
         that has been made.
         @ Author: Darin Kishore
         """
-        for safe_cell in self.safes:  # This checks every safe cell every time we want to make a safe move.
-            if safe_cell not in self.moves_made:
-                return safe_cell
+        # Cells clicked on since they were queued are dropped on the way
+        while self.safe_queue and self.safe_queue[0] in self.moves_made:
+            self.safe_queue.popleft()
+        if self.safe_queue:
+            return self.safe_queue[0]
         return None
 
     def make_random_move(self):
@@ -278,39 +609,120 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
         @ Author: Darin Kishore
+
+        If the total number of mines is known, chooses among the
+        cells least likely to be mines instead.
+        """
+        if self.total_mines is not None:
+            probabilities, interior = self.mine_probabilities()
+            lowest = min(probabilities.values(), default=None)
+            if interior is not None and (lowest is None or interior <= lowest):
+                lowest = interior
+            best = sorted(cell for cell, p in probabilities.items() if p == lowest)
+            if interior is not None and interior == lowest:
+                # Every interior cell ties, so pick one of them in proportion
+                interior_cells = self.unknown - len(probabilities)
+                if random.randrange(interior_cells + len(best)) < interior_cells:
+                    cell = self.interior_cell()
+                    if cell is not None:
+                        return cell
+            if best:
+                return random.choice(best)
+
+        if not self.unrevealed:
+            return None
+        return random.choice(self.unrevealed)
+
+    def interior_cell(self, tries=64):
+        """
+        Returns a random unknown cell that no sentence mentions, or None
+        if there is none. Samples the unrevealed cells first, and only
+        scans them all if sampling keeps hitting other cells.
         """
-        count = 0
-        while count < self.height * self.width:
-            cell = random.randint(0, self.height - 1), random.randint(0, self.width - 1)
-            if cell not in self.mines and cell not in self.moves_made:
+        for _ in range(tries if self.unrevealed else 0):
+            cell = random.choice(self.unrevealed)
+            if cell not in self.safes and not self.index.get(cell):
                 return cell
-            count += 1
-        return None
-    # Helper functions below
-
-    # @ Author: Darin Kishore
-    def trim_the_fat(self):
-        if len(self.knowledge) >= 2:
-            # the_fat = every combination of sentences we know
-            the_fat = list(itertools.combinations(self.knowledge, 2))
-            for sentence_pair in the_fat:  # sent_pair is tuple (a,b)
-                refactored_sentence = self.refactor(sentence_pair[0], sentence_pair[1])
-                if refactored_sentence is not None and refactored_sentence.cells:
-                    self.knowledge.remove(sentence_pair[0])  # TODO: double check that we should not remove
-                    self.knowledge.remove(sentence_pair[1])
-                    self.knowledge.append(refactored_sentence)
-
-    def refactor(self, sentence_1: Sentence, sentence_2: Sentence):
+        cells = [cell for cell in self.unrevealed
+                 if cell not in self.safes and not self.index.get(cell)]
+        return random.choice(cells) if cells else None
+
+    def components(self):
         """
-        @ Author: Darin Kishore
-        combines two sentences to make a shorter sentence.
-        :rtype: Sentence
-        """
-        new_sent = None
-        if sentence_1.cells <= sentence_2.cells:  # sent_1 is subset
-            new_sent = Sentence(sentence_2.cells - sentence_1.cells,
-                                sentence_2.count - sentence_1.count)
-        elif sentence_1.cells > sentence_2.cells:  # sent_2 is subset
-            new_sent = Sentence(sentence_2.cells - sentence_1.cells,
-                                sentence_2.count - sentence_1.count)
-        return new_sent
\ No newline at end of file
+        Splits the cells mentioned by the knowledge base into groups
+        linked by shared sentences, returning (cells, sentences) for
+        each group. Cells are listed in the order a breadth-first walk
+        reaches them, so each sentence's cells are close together.
+        """
+        groups = []
+        seen = set()
+        for start in self.index:
+            if start in seen or not self.index[start]:
+                continue
+            seen.add(start)
+            cells = [start]
+            sentences = {}
+            for cell in cells:
+                for sentence in self.index[cell]:
+                    if sentence not in sentences:
+                        sentences[sentence] = None
+                        for other in sorted(sentence.cells - seen):
+                            seen.add(other)
+                            cells.append(other)
+            groups.append((cells, list(sentences)))
+        return groups
+
+    def mine_probabilities(self):
+        """
+        Returns (probabilities, interior), where probabilities maps each
+        cell on the frontier to the exact probability that it is a mine,
+        given the knowledge base and the total number of mines, with
+        every arrangement of mines consistent with both equally likely.
+        interior is the probability shared by every unknown cell no
+        sentence mentions, or None if there are no such cells.
+
+        Solutions are counted per component of the frontier and combined
+        with the number of ways to place the remaining mines in the
+        interior. Returns ({}, None) if the knowledge is inconsistent
+        with the total.
+        """
+        groups = self.components()
+        interior = self.unknown - sum(len(cells) for cells, _ in groups)
+        remaining = self.total_mines - len(self.mines)
+
+        # Products of the components' solution counts before and after each one
+        counts = [count_solutions(cells, sentences) for cells, sentences in groups]
+        prefix = [[1]]
+        for totals, _ in counts:
+            prefix.append(multiply_polynomials(prefix[-1], totals))
+        suffix = [[1]]
+        for totals, _ in reversed(counts):
+            suffix.append(multiply_polynomials(suffix[-1], totals))
+        suffix.reverse()
+
+        def placements(k):
+            """Ways to put the mines not on the frontier in the interior."""
+            if not 0 <= remaining - k <= interior:
+                return 0
+            return math.comb(interior, remaining - k)
+
+        frontier = prefix[-1]
+        total = sum(ways * placements(k) for k, ways in enumerate(frontier))
+        if total == 0:
+            return {}, None
+
+        probabilities = {}
+        for n, (cells, _) in enumerate(groups):
+            others = multiply_polynomials(prefix[n], suffix[n + 1])
+            weights = [sum(ways * placements(k + j) for j, ways in enumerate(others))
+                       for k in range(len(cells) + 1)]
+            for cell, mines in counts[n][1].items():
+                probabilities[cell] = sum(
+                    ways * weights[k] for k, ways in enumerate(mines)
+                ) / total
+
+        if not interior:
+            return probabilities, None
+        expected = sum(ways * placements(k) * (remaining - k)
+                       for k, ways in enumerate(frontier))
+        return probabilities, expected / (total * interior)
@@ -0,0 +1,153 @@
+"""
+Headless Minesweeper simulation and win-rate benchmark for MinesweeperAI.
+
+Plays seeded games of the standard difficulty presets across a process
+pool and reports the win rate, guesses per game, per-move inference
+latency percentiles and how the knowledge base grows over a game.
+
+Usage: python simulate.py [--games N] [--workers N] [--presets NAME ...]
+"""
+
+import argparse
+import concurrent.futures
+import random
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+# (height, width, mines)
+PRESETS = {
+    "beginner": (9, 9, 10),
+    "intermediate": (16, 16, 40),
+    "expert": (16, 30, 99),
+}
+
+
+def play_game(preset, seed, safe_start=True):
+    """
+    Plays one game and returns (preset, won, guesses, latencies, sizes).
+    guesses counts the moves after the first that were not known to be
+    safe, latencies holds the seconds the AI spent choosing each move and
+    adding the cells it revealed, flooding through empty regions, and
+    sizes the number of sentences in the knowledge base after each move.
+
+    With safe_start, the board is built after the AI picks its first
+    move, keeping that cell and its neighbours free of mines.
+    """
+    height, width, mines = PRESETS[preset]
+    random.seed(seed)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+    start = time.perf_counter()
+    first = ai.make_random_move() if safe_start else None
+    thinking = time.perf_counter() - start
+    game = Minesweeper(height, width, mines, seed=seed, first_click=first)
+
+    guesses = 0
+    latencies = []
+    sizes = []
+    move = first
+    while True:
+        start = time.perf_counter()
+        if move is None:
+            move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is None:
+                break
+            guesses += 1
+        thinking += time.perf_counter() - start
+        if game.is_mine(move):
+            return preset, False, guesses, latencies, sizes
+
+        newly_revealed = game.reveal(move)
+        start = time.perf_counter()
+        ai.add_knowledge_many(newly_revealed)
+        latencies.append(thinking + time.perf_counter() - start)
+        sizes.append(len(ai.knowledge))
+        if len(ai.moves_made) == height * width - mines:
+            break
+        move = None
+        thinking = 0.0
+    return preset, True, guesses, latencies, sizes
+
+
+def percentile(values, fraction):
+    """
+    Returns the value at the given fraction of the sorted values,
+    interpolating linearly between neighbours.
+    """
+    values = sorted(values)
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def run_simulation(presets, games, workers=None, seed=0, safe_start=True):
+    """
+    Plays `games` games of every preset and returns the list of
+    play_game results.
+    """
+    jobs = [(preset, seed + n, safe_start)
+            for preset in presets for n in range(games)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(play_game, *zip(*jobs), chunksize=16))
+
+
+def report(results):
+    """
+    Prints win rates, guesses, latencies and knowledge base sizes per preset.
+    """
+    by_preset = {}
+    for result in results:
+        by_preset.setdefault(result[0], []).append(result[1:])
+
+    print(f"{'preset':>13} {'games':>7} {'win %':>7} {'guesses':>8} "
+          f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for preset, games in by_preset.items():
+        wins = sum(won for won, _, _, _ in games)
+        guesses = sum(guesses for _, guesses, _, _ in games) / len(games)
+        latencies = [t for _, _, game_latencies, _ in games for t in game_latencies]
+        print(f"{preset:>13} {len(games):>7} {100 * wins / len(games):>7.1f} "
+              f"{guesses:>8.2f} "
+              f"{percentile(latencies, 0.5) * 1000:>8.3f} "
+              f"{percentile(latencies, 0.9) * 1000:>8.3f} "
+              f"{percentile(latencies, 0.99) * 1000:>8.3f} "
+              f"{max(latencies, default=0.0) * 1000:>8.3f}")
+
+    # Knowledge base size at each tenth of the way through a game
+    print()
+    print(f"{'preset':>13} " + " ".join(f"{f'{10 * k}%':>6}" for k in range(1, 11)))
+    for preset, games in by_preset.items():
+        means = []
+        for k in range(1, 11):
+            samples = [sizes[min(len(sizes) - 1, len(sizes) * k // 10)]
+                       for _, _, _, sizes in games if sizes]
+            means.append(sum(samples) / len(samples) if samples else 0.0)
+        print(f"{preset:>13} " + " ".join(f"{mean:>6.1f}" for mean in means))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=1000,
+                        help="games per preset")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--presets", nargs="+", choices=list(PRESETS),
+                        default=list(PRESETS))
+    parser.add_argument("--unsafe-start", action="store_true",
+                        help="allow the first move to hit a mine")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_simulation(args.presets, args.games, args.workers, args.seed,
+                             not args.unsafe_start)
+    print(f"Played {len(results)} games in {time.perf_counter() - start:.2f}s\n")
+    report(results)
+
+
+if __name__ == "__main__":
+    main()